@@ -1,9 +1,15 @@
 """API client for communicating with the backend."""
 import aiohttp  # type: ignore
-import json
-from typing import Optional, Dict, Any, List
-from config import API_BASE_URL
+import asyncio
+import base64
+import random
+import time
+import orjson
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+from config import config
 from storage import user_storage
+from cache import REDIS_CACHED_OWNERS, SingleFlight, redis_cached, response_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,38 +22,156 @@ TIMEOUT = aiohttp.ClientTimeout(
     sock_read=90  # Timeout for reading data (1.5 minutes)
 )
 
+# Endpoint templates for detail routes
+TOKEN_REFRESH_URL = '/api/v1/auth/token/refresh/'
+EMPLOYEE_URL = '/api/v1/auth/employees/{}/'
+STUDENT_URL = '/api/v1/auth/students/{}/'
+GROUP_URL = '/api/v1/education/groups/{}/'
+ATTENDANCE_URL = '/api/v1/education/attendances/{}/'
+INVOICE_URL = '/api/v1/payment/invoices/{}/'
+
+# Refresh the access token proactively when it expires within this many seconds
+TOKEN_REFRESH_MARGIN = 30
+
+
+def _get_token_expiry(token: Optional[str]) -> Optional[int]:
+    """Read the `exp` claim from a JWT without verifying its signature."""
+    if not token:
+        return None
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        exp = orjson.loads(base64.urlsafe_b64decode(payload)).get('exp')
+        return int(exp) if exp is not None else None
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
+
+# Transient gateway errors worth retrying, only for idempotent methods
+RETRY_STATUSES = frozenset({502, 503, 504})
+RETRY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRY_BACKOFF = 2  # Base delay in seconds, doubled on every attempt
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter (avoids synchronized retries)."""
+    return random.uniform(0, RETRY_BACKOFF * 2 ** attempt)
+
+
+# In-flight token refreshes keyed by user_id, so concurrent 401s for the
+# same user share a single refresh request
+_refresh_flight = SingleFlight()
+
+# Conditional GET cache for rarely changing lists:
+# (user_id, url) -> (etag, stored_at, response_data)
+# Entries with an ETag are revalidated with If-None-Match; entries without
+# one (backend didn't send it) are served for LIST_CACHE_TTL seconds.
+_list_cache: "OrderedDict[Tuple[Optional[int], str], Tuple[Optional[str], float, Dict[str, Any]]]" = OrderedDict()
+LIST_CACHE_SIZE = 512
+LIST_CACHE_TTL = 30
+
+
+def _store_list_cache(key: Tuple[Optional[int], str], etag: Optional[str], data: Dict[str, Any]):
+    """Store a list response, evicting the least recently used entries."""
+    _list_cache[key] = (etag, time.monotonic(), data)
+    _list_cache.move_to_end(key)
+    while len(_list_cache) > LIST_CACHE_SIZE:
+        _list_cache.popitem(last=False)
+
+
+# Shared HTTP session (one connection pool for the whole process)
+# Reusing a single session keeps TCP/TLS connections alive between
+# handler calls instead of doing a fresh handshake on every request.
+_shared_session: Optional[aiohttp.ClientSession] = None
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Get or create the shared aiohttp session."""
+    global _shared_session
+    if _shared_session is None or _shared_session.closed:
+        # For external URLs (https://), SSL verification is enabled
+        # For internal URLs (http://), SSL verification is disabled
+        connector = aiohttp.TCPConnector(
+            ssl=config.api_base_url.startswith('https://'),
+            limit=200,
+            # Every request goes to the same backend host
+            limit_per_host=50,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True,
+            keepalive_timeout=75
+        )
+        _shared_session = aiohttp.ClientSession(timeout=TIMEOUT, connector=connector)
+    return _shared_session
+
+
+async def close_session():
+    """Close the shared aiohttp session."""
+    global _shared_session
+    if _shared_session and not _shared_session.closed:
+        await _shared_session.close()
+    _shared_session = None
+    _clients.clear()
+
+
+class APIError(Exception):
+    """The backend answered with an error status."""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(f"API Error ({status}): {message}")
+        self.status = status
+        self.message = message
+
 
 class APIClient:
     """Client for making API requests to the backend."""
     
     def __init__(self, access_token: Optional[str] = None, user_id: Optional[int] = None):
-        self.base_url = API_BASE_URL
+        self.base_url = config.api_base_url
+        self._headers: Optional[Dict[str, str]] = None
         self.access_token = access_token
         self.user_id = user_id
-        self.session: Optional[aiohttp.ClientSession] = None
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(timeout=TIMEOUT)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        # The underlying session is shared and closed on bot shutdown
+        pass
+    
+    async def batch(self, *coros, return_exceptions: bool = False) -> List[Any]:
+        """Run independent API calls concurrently and return their results in order."""
+        return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+    
+    @property
+    def access_token(self) -> Optional[str]:
+        return self._access_token
+    
+    @access_token.setter
+    def access_token(self, value: Optional[str]):
+        self._access_token = value
+        self._access_exp = _get_token_expiry(value)
+        # Headers depend on the token, rebuild them on next request
+        self._headers = None
     
     def _get_headers(self) -> Dict[str, str]:
-        """Get headers for API requests."""
-        headers = {
-            'Content-Type': 'application/json',
-        }
-        if self.access_token:
-            headers['Authorization'] = f'Bearer {self.access_token}'
-        return headers
+        """Get headers for API requests (built once per access token)."""
+        if self._headers is None:
+            headers = {
+                'Content-Type': 'application/json',
+            }
+            if self._access_token:
+                headers['Authorization'] = f'Bearer {self._access_token}'
+            self._headers = headers
+        return self._headers
     
     async def _refresh_access_token(self) -> Optional[str]:
         """Refresh access token if user_id is provided."""
         if not self.user_id:
             return None
         
+        return await _refresh_flight.do(self.user_id, self._fetch_new_access_token)
+    
+    async def _fetch_new_access_token(self) -> Optional[str]:
+        """Exchange the stored refresh token for a new access token."""
         refresh_token = await user_storage.get_refresh_token(self.user_id)
         if not refresh_token:
             return None
@@ -58,24 +182,86 @@ class APIClient:
             if self.base_url.startswith('http://api:') or self.base_url.startswith('http://localhost:'):
                 headers['Host'] = 'api.bimuz.uz'
             
-            async with aiohttp.ClientSession(timeout=TIMEOUT) as session:
-                url = f"{self.base_url}/api/v1/auth/token/refresh/"
-                async with session.post(
-                    url,
-                    json={'refresh': refresh_token},
-                    headers=headers
-                ) as response:
-                    if response.status == 200:
-                        response_data = await response.json()
-                        new_access_token = response_data.get('access')
-                        if new_access_token:
-                            await user_storage.update_access_token(self.user_id, new_access_token)
-                            return new_access_token
+            session = await get_session()
+            url = self.base_url + TOKEN_REFRESH_URL
+            async with session.post(
+                url,
+                data=orjson.dumps({'refresh': refresh_token}),
+                headers=headers
+            ) as response:
+                if response.status == 200:
+                    response_data = orjson.loads(await response.read())
+                    new_access_token = response_data.get('access')
+                    if new_access_token:
+                        await user_storage.update_access_token(self.user_id, new_access_token)
+                        return new_access_token
         except Exception as e:
-            logger.error(f"Token refresh error: {str(e)}")
+            logger.error("Token refresh error: %s", e)
         
         return None
     
+    async def _handle_response(self, response: aiohttp.ClientResponse, url: str) -> Dict[str, Any]:
+        """Convert an API response into a result dict, raising on server errors."""
+        status = response.status
+        
+        # Handle 204 No Content (common for DELETE requests)
+        if status == 204:
+            # 204 must not carry a body; if the backend sent one anyway,
+            # drop the connection instead of returning it to the pool
+            if response.content_length:
+                response.close()
+            return {'success': True, 'message': 'Operation completed successfully'}
+        
+        # Try to parse JSON response
+        try:
+            response_data = orjson.loads(await response.read())
+        except orjson.JSONDecodeError as e:
+            # If response is not JSON, get text
+            text = await response.text()
+            logger.error("JSON parsing error for %s: status=%s, text=%s", url, status, text[:500])
+            # If it's a 400 error with HTML, likely CSRF or validation issue
+            if status == 400 and 'text/html' in response.headers.get('Content-Type', ''):
+                raise Exception(f"Bad Request (400): Server returned HTML instead of JSON. Check if API endpoint accepts JSON and CSRF is disabled for API routes.")
+            raise Exception(f"Invalid JSON response (status {status}): {text[:200]}")
+        
+        if status >= 400:
+            # Handle 400 errors - might be HTML or JSON
+            if status == 400:
+                # Check if response is JSON
+                content_type = response.headers.get('Content-Type', '')
+                if 'application/json' in content_type or 'text/json' in content_type:
+                    # Return error response in same format as success response
+                    return {
+                        'success': False,
+                        'message': response_data.get('message', 'Validation error'),
+                        'errors': response_data.get('errors', response_data)
+                    }
+                else:
+                    # HTML error response (Django default error page)
+                    logger.error("API returned HTML error page (400) for %s: %s", url, response_data)
+                    # Try to extract error from response_data if it was parsed
+                    error_msg = 'Validation error'
+                    if isinstance(response_data, dict):
+                        error_msg = response_data.get('message', response_data.get('detail', 'Validation error'))
+                    elif isinstance(response_data, str) and response_data:
+                        error_msg = response_data[:200]
+                    
+                    return {
+                        'success': False,
+                        'message': error_msg,
+                        'errors': {}
+                    }
+            error_msg = response_data.get('message', 'Unknown error')
+            errors = response_data.get('errors', {})
+            if errors:
+                if isinstance(errors, dict):
+                    error_msg += f" - {errors}"
+                else:
+                    error_msg += f" - {str(errors)}"
+            raise APIError(status, error_msg)
+        
+        return response_data
+    
     async def _request(
         self,
         method: str,
@@ -83,202 +269,141 @@ class APIClient:
         data: Optional[Dict[str, Any]] = None,
         params: Optional[Dict[str, Any]] = None,
         retry_on_401: bool = True,
-        max_retries: int = 2
+        max_retries: int = 2,
+        cache: bool = False,
+        invalidate: bool = False
     ) -> Dict[str, Any]:
-        """Make an API request with retry logic for network errors."""
-        if not self.session:
-            self.session = aiohttp.ClientSession(timeout=TIMEOUT)
+        """Make an API request with retry logic for network errors.
         
-        # Ensure endpoint starts with /
-        if not endpoint.startswith('/'):
-            endpoint = '/' + endpoint
+        With cache=True (GET only) the response is kept in the list cache and
+        revalidated with ETag / If-None-Match on the next call.
+        With invalidate=True (data-changing writes) the list cache and the
+        redis_cached responses of all users are dropped once the write succeeds.
+        """
+        response = await self._send(method, endpoint, data, params, retry_on_401, max_retries, cache)
+        if invalidate and not (isinstance(response, dict) and response.get('success') is False):
+            # Dropped only after the write has landed, so a GET racing it
+            # can't store the old data again
+            _list_cache.clear()
+            await response_cache.delete(*REDIS_CACHED_OWNERS)
+        return response
+    
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict[str, Any]],
+        params: Optional[Dict[str, Any]],
+        retry_on_401: bool,
+        max_retries: int,
+        cache: bool
+    ) -> Dict[str, Any]:
+        """Send the request of _request, retrying network and gateway errors."""
+        session = await get_session()
         
-        # Ensure base_url doesn't end with /
-        base_url = self.base_url.rstrip('/')
-        url = f"{base_url}{endpoint}"
+        # Refresh an about-to-expire token before sending instead of
+        # waiting for a 401 and retrying the whole request
+        if (
+            retry_on_401
+            and self.user_id
+            and self._access_exp is not None
+            and self._access_exp - time.time() < TOKEN_REFRESH_MARGIN
+        ):
+            new_token = await self._refresh_access_token()
+            if new_token:
+                self.access_token = new_token
+                retry_on_401 = False
+        
+        # base_url is already stripped of the trailing slash in config
+        url = self.base_url + endpoint if endpoint[0] == '/' else self.base_url + '/' + endpoint
         headers = self._get_headers()
         
-        logger.info(f"Making {method} request to: {url}")
-        if data:
-            logger.debug(f"Request data: {str(data)[:200]}")
-        if params:
-            logger.debug(f"Request params: {params}")
+        cache_key = cached = None
+        if cache:
+            cache_key = (self.user_id, url)
+            cached = _list_cache.get(cache_key)
+            if cached is not None:
+                etag, stored_at, cached_data = cached
+                if etag:
+                    headers = {**headers, 'If-None-Match': etag}
+                elif time.monotonic() - stored_at < LIST_CACHE_TTL:
+                    return cached_data
         
-        # Create connector with SSL verification
-        # For external URLs (https://), SSL verification is enabled
-        # For internal URLs (http://), SSL verification is disabled
-        ssl_verify = self.base_url.startswith('https://')
-        connector = aiohttp.TCPConnector(
-            ssl=ssl_verify,  # Enable SSL verification for HTTPS, disable for HTTP
-            limit=100,
-            limit_per_host=30
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Making %s request to: %s", method, url)
+            if data:
+                logger.debug("Request data: %s", str(data)[:200])
+            if params:
+                logger.debug("Request params: %s", params)
         
-        # Use custom session with connector if session doesn't exist
-        if not self.session:
-            self.session = aiohttp.ClientSession(
-                timeout=TIMEOUT,
-                connector=connector
-            )
+        # Encode once with orjson; Content-Type is already set in the headers
+        body = orjson.dumps(data) if data is not None else None
         
         last_error = None
         for attempt in range(max_retries + 1):
             try:
-                logger.info(f"Sending {method} request (attempt {attempt + 1}/{max_retries + 1})...")
-                async with self.session.request(
-                    method=method,
-                    url=url,
-                    json=data,
-                    params=params,
-                    headers=headers
-                ) as response:
-                    logger.info(f"Response received: status={response.status}")
-                    # Handle 204 No Content (common for DELETE requests)
-                    if response.status == 204:
-                        # Some backends return 204 with JSON body despite HTTP spec
-                        # Try to read body, but don't fail if it's empty or unreadable
-                        try:
-                            # Check if there's content to read
-                            content_length = response.headers.get('Content-Length', '0')
-                            if content_length and int(content_length) > 0:
-                                text = await response.read()
-                                if text:
-                                    try:
-                                        response_data = json.loads(text.decode('utf-8'))
-                                        if response_data.get('success'):
-                                            return response_data
-                                    except (json.JSONDecodeError, UnicodeDecodeError):
-                                        pass
-                            # If no body or parsing failed, return success
-                            return {'success': True, 'message': 'Operation completed successfully'}
-                        except Exception as e:
-                            # If any error reading 204 response, assume success
-                            logger.debug(f"204 response handling for {url}: {str(e)}")
-                            return {'success': True, 'message': 'Operation completed successfully'}
-                    
-                    # Try to parse JSON response
-                    try:
-                        response_data = await response.json()
-                    except (aiohttp.ContentTypeError, json.JSONDecodeError) as e:
-                        # If response is not JSON, get text
-                        text = await response.text()
-                        logger.error(f"JSON parsing error for {url}: status={response.status}, text={text[:500]}")
-                        # If it's a 400 error with HTML, likely CSRF or validation issue
-                        if response.status == 400 and 'text/html' in response.headers.get('Content-Type', ''):
-                            raise Exception(f"Bad Request (400): Server returned HTML instead of JSON. Check if API endpoint accepts JSON and CSRF is disabled for API routes.")
-                        raise Exception(f"Invalid JSON response (status {response.status}): {text[:200]}")
-                    
-                    # Handle 401 Unauthorized - try to refresh token
-                    if response.status == 401 and retry_on_401 and self.user_id:
-                        new_token = await self._refresh_access_token()
-                        if new_token:
+                logger.debug("Sending %s request (attempt %d/%d)...", method, attempt + 1, max_retries + 1)
+                while True:
+                    async with session.request(
+                        method=method,
+                        url=url,
+                        data=body,
+                        params=params,
+                        headers=headers
+                    ) as response:
+                        status = response.status
+                        logger.debug("Response received: status=%s", status)
+                        # Handle 401 Unauthorized - refresh token and resend once
+                        if status == 401 and retry_on_401 and self.user_id:
+                            new_token = await self._refresh_access_token()
+                            if not new_token:
+                                # Token refresh failed, user needs to login again
+                                raise Exception("Authentication failed. Please login again.")
                             self.access_token = new_token
                             headers = self._get_headers()
-                            # Retry the request with new token
-                            async with self.session.request(
-                                method=method,
-                                url=url,
-                                json=data,
-                                params=params,
-                                headers=headers
-                            ) as retry_response:
-                                # Handle 204 No Content on retry
-                                if retry_response.status == 204:
-                                    try:
-                                        content_length = retry_response.headers.get('Content-Length', '0')
-                                        if content_length and int(content_length) > 0:
-                                            text = await retry_response.read()
-                                            if text:
-                                                try:
-                                                    response_data = json.loads(text.decode('utf-8'))
-                                                    if response_data.get('success'):
-                                                        return response_data
-                                                except (json.JSONDecodeError, UnicodeDecodeError):
-                                                    pass
-                                        return {'success': True, 'message': 'Operation completed successfully'}
-                                    except Exception:
-                                        return {'success': True, 'message': 'Operation completed successfully'}
-                                
-                                try:
-                                    response_data = await retry_response.json()
-                                except (aiohttp.ContentTypeError, json.JSONDecodeError) as e:
-                                    text = await retry_response.text()
-                                    logger.error(f"JSON parsing error on retry for {url}: {text[:200]}")
-                                    raise Exception(f"Invalid JSON response: {text[:200]}")
-                                
-                                if retry_response.status >= 400:
-                                    # For 400 errors, return the response data instead of raising exception
-                                    if retry_response.status == 400:
-                                        return {
-                                            'success': False,
-                                            'message': response_data.get('message', 'Validation error'),
-                                            'errors': response_data.get('errors', response_data)
-                                        }
-                                    error_msg = response_data.get('message', 'Unknown error')
-                                    errors = response_data.get('errors', {})
-                                    if errors:
-                                        error_msg += f" - {errors}"
-                                    raise Exception(f"API Error ({retry_response.status}): {error_msg}")
-                                
-                                return response_data
-                        else:
-                            # Token refresh failed, user needs to login again
-                            raise Exception("Authentication failed. Please login again.")
-                    
-                    if response.status >= 400:
-                        # Handle 400 errors - might be HTML or JSON
-                        if response.status == 400:
-                            # Check if response is JSON
-                            content_type = response.headers.get('Content-Type', '')
-                            if 'application/json' in content_type or 'text/json' in content_type:
-                                # Return error response in same format as success response
-                                return {
-                                    'success': False,
-                                    'message': response_data.get('message', 'Validation error'),
-                                    'errors': response_data.get('errors', response_data)
-                                }
-                            else:
-                                # HTML error response (Django default error page)
-                                logger.error(f"API returned HTML error page (400) for {url}: {response_data}")
-                                # Try to extract error from response_data if it was parsed
-                                error_msg = 'Validation error'
-                                if isinstance(response_data, dict):
-                                    error_msg = response_data.get('message', response_data.get('detail', 'Validation error'))
-                                elif isinstance(response_data, str) and response_data:
-                                    error_msg = response_data[:200]
-                                
-                                return {
-                                    'success': False,
-                                    'message': error_msg,
-                                    'errors': {}
-                                }
-                        error_msg = response_data.get('message', 'Unknown error')
-                        errors = response_data.get('errors', {})
-                        if errors:
-                            if isinstance(errors, dict):
-                                error_msg += f" - {errors}"
-                            else:
-                                error_msg += f" - {str(errors)}"
-                        raise Exception(f"API Error ({response.status}): {error_msg}")
-                    
-                    return response_data
+                            retry_on_401 = False
+                            continue
+                        if (
+                            status in RETRY_STATUSES
+                            and method in RETRY_METHODS
+                            and attempt < max_retries
+                        ):
+                            break
+                        if status == 304 and cached is not None:
+                            # Not modified - reuse the cached payload without parsing
+                            _store_list_cache(cache_key, cached[0], cached[2])
+                            return cached[2]
+                        response_data = await self._handle_response(response, url)
+                        if cache_key is not None and status == 200:
+                            _store_list_cache(cache_key, response.headers.get('ETag'), response_data)
+                        return response_data
+                # Transient server error - back off and try again
+                wait_time = _backoff_delay(attempt)
+                logger.warning(
+                    "Server error %s for %s (attempt %d/%d). Retrying in %.1fs...",
+                    status, url, attempt + 1, max_retries + 1, wait_time
+                )
+                await asyncio.sleep(wait_time)
+                continue
             except aiohttp.ClientError as e:
                 error_str = str(e)
-                # Check if it's a 204 parsing issue - if so, assume success
-                if "204" in error_str or "Expected HTTP" in error_str or "RTSP" in error_str or "ICE" in error_str:
-                    logger.debug(f"204 response parsing issue for {url}, assuming success: {str(e)}")
+                # Backend may send a body with 204 on DELETE, which breaks response parsing
+                if method == 'DELETE' and ("204" in error_str or "Expected HTTP" in error_str):
+                    logger.debug("204 response parsing issue for %s, assuming success: %s", url, e)
                     return {'success': True, 'message': 'Operation completed successfully'}
                 
                 last_error = e
                 # Retry on network errors (timeout, connection errors, etc.)
                 if attempt < max_retries:
-                    wait_time = (attempt + 1) * 2  # Exponential backoff: 2s, 4s
-                    logger.warning(f"Network error for {url} (attempt {attempt + 1}/{max_retries + 1}): {str(e)}. Retrying in {wait_time}s...")
-                    import asyncio
+                    wait_time = _backoff_delay(attempt)
+                    logger.warning(
+                        "Network error for %s (attempt %d/%d): %s. Retrying in %.1fs...",
+                        url, attempt + 1, max_retries + 1, e, wait_time
+                    )
                     await asyncio.sleep(wait_time)
                     continue
                 else:
-                    logger.error(f"Network error for {url} after {max_retries + 1} attempts: {str(e)}")
+                    logger.error("Network error for %s after %s attempts: %s", url, max_retries + 1, e)
                     error_type = type(e).__name__
                     error_msg = str(e)
                     # Provide more specific error message
@@ -306,17 +431,22 @@ class APIClient:
     
     async def refresh_token(self, refresh_token: str) -> Dict[str, Any]:
         """Refresh access token."""
-        return await self._request('POST', '/api/v1/auth/token/refresh/', {
+        return await self._request('POST', TOKEN_REFRESH_URL, {
             'refresh': refresh_token
         })
     
     # Employee endpoints
-    async def get_employees(self, search: Optional[str] = None) -> Dict[str, Any]:
-        """Get list of employees."""
-        params = {}
-        if search:
-            params['search'] = search
-        response = await self._request('GET', '/api/v1/auth/employees/', params=params)
+    async def get_employees(self, search: Optional[str] = None, cache: bool = True) -> Dict[str, Any]:
+        """Get list of employees.
+        
+        The full list goes through the list cache (ETag revalidation); pass
+        cache=False when the list is fetched while a write is in flight.
+        """
+        params = {'search': search} if search else None
+        # The list cache is keyed by URL only, so searches are never cached
+        response = await self._request(
+            'GET', '/api/v1/auth/employees/', params=params, cache=cache and not search
+        )
         # Backend can return either pagination format or success_response format
         # Pagination: {'count': ..., 'next': ..., 'results': [...]}
         # Success: {'success': True, 'data': [...]}
@@ -324,85 +454,93 @@ class APIClient:
     
     async def get_employee(self, employee_id: int) -> Dict[str, Any]:
         """Get employee by ID."""
-        return await self._request('GET', f'/api/v1/auth/employees/{employee_id}/')
+        return await self._request('GET', EMPLOYEE_URL.format(employee_id))
     
     async def create_employee(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new employee (requires Developer role)."""
         # Employee registration doesn't require authentication token
         # But we still pass it if available for logging purposes
-        return await self._request('POST', '/api/v1/auth/register/', data, retry_on_401=False)
+        return await self._request('POST', '/api/v1/auth/register/', data, retry_on_401=False, invalidate=True)
     
     async def update_employee(self, employee_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update employee."""
-        return await self._request('PATCH', f'/api/v1/auth/employees/{employee_id}/', data)
+        return await self._request('PATCH', EMPLOYEE_URL.format(employee_id), data, invalidate=True)
     
     async def delete_employee(self, employee_id: int) -> Dict[str, Any]:
         """Delete employee."""
-        return await self._request('DELETE', f'/api/v1/auth/employees/{employee_id}/')
+        return await self._request('DELETE', EMPLOYEE_URL.format(employee_id), invalidate=True)
     
     # Student endpoints
     async def get_students(self, search: Optional[str] = None) -> Dict[str, Any]:
         """Get list of students."""
-        params = {}
-        if search:
-            params['search'] = search
+        params = {'search': search} if search else None
         response = await self._request('GET', '/api/v1/auth/students/', params=params)
         # Backend can return either pagination format or success_response format
         return response
     
     async def get_student(self, student_id: int) -> Dict[str, Any]:
         """Get student by ID."""
-        return await self._request('GET', f'/api/v1/auth/students/{student_id}/')
+        return await self._request('GET', STUDENT_URL.format(student_id))
     
     async def create_student(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new student (for employees - requires Developer or Administrator role)."""
-        return await self._request('POST', '/api/v1/auth/students/', data)
+        return await self._request('POST', '/api/v1/auth/students/', data, invalidate=True)
     
     async def update_student(self, student_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update student."""
-        return await self._request('PATCH', f'/api/v1/auth/students/{student_id}/', data)
+        return await self._request('PATCH', STUDENT_URL.format(student_id), data, invalidate=True)
     
     async def delete_student(self, student_id: int) -> Dict[str, Any]:
         """Delete student."""
-        return await self._request('DELETE', f'/api/v1/auth/students/{student_id}/')
+        return await self._request('DELETE', STUDENT_URL.format(student_id), invalidate=True)
     
     # Group endpoints
     async def get_groups(self) -> Dict[str, Any]:
         """Get list of groups."""
-        response = await self._request('GET', '/api/v1/education/groups/')
+        response = await self._request('GET', '/api/v1/education/groups/', cache=True)
         # Backend can return either pagination format or success_response format
         return response
     
+    @redis_cached()
     async def get_group(self, group_id: int) -> Dict[str, Any]:
         """Get group by ID."""
-        return await self._request('GET', f'/api/v1/education/groups/{group_id}/')
+        return await self._request('GET', GROUP_URL.format(group_id))
     
     async def create_group(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new group."""
-        return await self._request('POST', '/api/v1/education/groups/', data)
+        return await self._request('POST', '/api/v1/education/groups/', data, invalidate=True)
     
     async def update_group(self, group_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update group."""
-        return await self._request('PATCH', f'/api/v1/education/groups/{group_id}/', data)
+        return await self._request('PATCH', GROUP_URL.format(group_id), data, invalidate=True)
     
     async def delete_group(self, group_id: int) -> Dict[str, Any]:
         """Delete group."""
-        return await self._request('DELETE', f'/api/v1/education/groups/{group_id}/')
+        return await self._request('DELETE', GROUP_URL.format(group_id), invalidate=True)
     
     # Attendance endpoints
-    async def get_attendances(self) -> Dict[str, Any]:
-        """Get list of attendances."""
-        response = await self._request('GET', '/api/v1/education/attendances/')
+    @redis_cached()
+    async def get_attendances(self, expand: Optional[str] = None, group: Optional[int] = None) -> Dict[str, Any]:
+        """Get list of attendances, optionally only for one group.
+        
+        expand='mentor' asks the backend to include mentor_name in each row.
+        """
+        params = {
+            key: value
+            for key, value in (('expand', expand), ('group', group))
+            if value
+        }
+        response = await self._request('GET', '/api/v1/education/attendances/', params=params or None)
         # Backend can return either pagination format or success_response format
         return response
     
     async def get_attendance(self, attendance_id: int) -> Dict[str, Any]:
         """Get attendance by ID."""
-        return await self._request('GET', f'/api/v1/education/attendances/{attendance_id}/')
+        return await self._request('GET', ATTENDANCE_URL.format(attendance_id))
     
     async def create_attendance(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new attendance."""
-        return await self._request('POST', '/api/v1/education/attendances/', data)
+        return await self._request('POST', '/api/v1/education/attendances/', data, invalidate=True)
     
     # Invoice/Payment endpoints
     async def get_invoices(
@@ -413,22 +551,18 @@ class APIClient:
         page: Optional[int] = None
     ) -> Dict[str, Any]:
         """Get list of invoices."""
-        params = {}
-        if search:
-            params['search'] = search
-        if status:
-            params['status'] = status
-        if ordering:
-            params['ordering'] = ordering
-        if page:
-            params['page'] = page
-        response = await self._request('GET', '/api/v1/payment/employee-invoices/', params=params)
+        params = {
+            key: value
+            for key, value in (('search', search), ('status', status), ('ordering', ordering), ('page', page))
+            if value
+        }
+        response = await self._request('GET', '/api/v1/payment/employee-invoices/', params=params or None)
         # Backend can return either pagination format or success_response format
         return response
     
     async def get_invoice(self, invoice_id: int) -> Dict[str, Any]:
         """Get invoice by ID."""
-        return await self._request('GET', f'/api/v1/payment/invoices/{invoice_id}/')
+        return await self._request('GET', INVOICE_URL.format(invoice_id))
     
     async def create_payment_link(self, invoice_id: int, return_url: Optional[str] = None) -> Dict[str, Any]:
         """Create payment link for invoice."""
@@ -440,24 +574,51 @@ class APIClient:
     # Booking endpoints
     async def get_booking_groups(self) -> Dict[str, Any]:
         """Get groups available for booking."""
-        return await self._request('GET', '/api/v1/education/booking/groups/')
+        return await self._request('GET', '/api/v1/education/booking/groups/', cache=True)
     
     async def book_student(self, student_id: int, group_id: int) -> Dict[str, Any]:
         """Book a student into a group."""
         return await self._request('POST', '/api/v1/education/booking/book/', {
             'student_id': student_id,
             'group_id': group_id
-        })
+        }, invalidate=True)
     
     async def cancel_booking(self, student_id: int) -> Dict[str, Any]:
         """Cancel student booking."""
         return await self._request('POST', '/api/v1/education/booking/cancel/', {
             'student_id': student_id
-        })
+        }, invalidate=True)
     
     async def change_group(self, student_id: int, new_group_id: int) -> Dict[str, Any]:
         """Change student's group."""
         return await self._request('POST', '/api/v1/education/booking/change-group/', {
             'student_id': student_id,
             'new_group_id': new_group_id
-        })
+        }, invalidate=True)
+
+
+# Long-lived clients keyed by user_id, least recently used evicted first
+_clients: "OrderedDict[int, APIClient]" = OrderedDict()
+CLIENT_CACHE_SIZE = 1024
+
+
+def get_api_client(access_token: Optional[str] = None, user_id: Optional[int] = None) -> APIClient:
+    """Get an API client for a user.
+    
+    All clients share one pooled HTTP session, so no `async with` is needed.
+    A user's client is kept between handler calls, so its headers and token
+    expiry are only rebuilt when the access token changes.
+    """
+    if user_id is None:
+        return APIClient(access_token=access_token)
+    
+    client = _clients.get(user_id)
+    if client is None:
+        client = _clients[user_id] = APIClient(access_token=access_token, user_id=user_id)
+        while len(_clients) > CLIENT_CACHE_SIZE:
+            _clients.popitem(last=False)
+    else:
+        _clients.move_to_end(user_id)
+        if client.access_token != access_token:
+            client.access_token = access_token
+    return client
@@ -1,30 +1,24 @@
 """Main bot file."""
 import asyncio
 import logging
+import sys
 import aiohttp
+import orjson
 from aiohttp import web
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.fsm.storage.redis import RedisStorage
 from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
-from config import (
-    BOT_TOKEN,
-    BOT_MODE,
-    WEBHOOK_HOST,
-    WEBHOOK_PATH,
-    WEBHOOK_SECRET,
-    WEBHOOK_PORT
-)
+# uvloop is only used on Linux (production containers); elsewhere keep asyncio
+uvloop = None
+if sys.platform.startswith('linux'):
+    try:
+        import uvloop
+    except ImportError:
+        pass
+from config import config
 
-from handlers import (
-    auth,
-    students,
-    groups,
-    payments,
-    employees,
-    attendance,
-    common,
-    documents
-)
+from handlers import ROUTERS
 
 # Configure logging
 logging.basicConfig(
@@ -33,6 +27,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Abandoned FSM flows (which may hold a typed password) expire after this many seconds
+FSM_TTL = 6 * 60 * 60
+
 
 async def setup_bot_commands(bot: Bot):
     """Set up bot commands menu."""
@@ -51,45 +48,48 @@ async def on_startup(bot: Bot):
     await setup_bot_commands(bot)
     
     # Set webhook if in prod mode
-    if BOT_MODE == 'prod':
+    if config.bot_mode == 'prod':
         # Validate webhook URL
-        if not WEBHOOK_HOST:
+        if not config.webhook_host:
             raise ValueError("WEBHOOK_HOST is required when BOT_MODE=prod")
         
-        if not WEBHOOK_HOST.startswith('https://'):
-            raise ValueError(f"WEBHOOK_HOST must start with https://, got: {WEBHOOK_HOST}")
+        if not config.webhook_host.startswith('https://'):
+            raise ValueError(f"WEBHOOK_HOST must start with https://, got: {config.webhook_host}")
         
         # Remove trailing slash if exists
-        webhook_host = WEBHOOK_HOST.rstrip('/')
-        webhook_path = WEBHOOK_PATH.lstrip('/')  # Remove leading slash if exists
+        webhook_host = config.webhook_host.rstrip('/')
+        webhook_path = config.webhook_path.lstrip('/')  # Remove leading slash if exists
         webhook_url = f"{webhook_host}/{webhook_path}" if webhook_path else webhook_host
         
-        logger.info(f"Setting webhook to: {webhook_url}")
+        logger.info("Setting webhook to: %s", webhook_url)
         
         try:
             await bot.set_webhook(
                 url=webhook_url,
-                secret_token=WEBHOOK_SECRET if WEBHOOK_SECRET else None,
+                secret_token=config.webhook_secret if config.webhook_secret else None,
                 allowed_updates=["message", "callback_query", "chat_member"]
             )
-            logger.info(f"✅ Webhook successfully set to: {webhook_url}")
+            logger.info("✅ Webhook successfully set to: %s", webhook_url)
             
             # Verify webhook info
             webhook_info = await bot.get_webhook_info()
-            logger.info(f"Webhook info: pending_update_count={webhook_info.pending_update_count}, "
-                       f"last_error_date={webhook_info.last_error_date}, "
-                       f"last_error_message={webhook_info.last_error_message}")
+            logger.info(
+                "Webhook info: pending_update_count=%s, last_error_date=%s, last_error_message=%s",
+                webhook_info.pending_update_count,
+                webhook_info.last_error_date,
+                webhook_info.last_error_message
+            )
             
             if webhook_info.last_error_message:
-                logger.warning(f"⚠️ Webhook error: {webhook_info.last_error_message}")
+                logger.warning("⚠️ Webhook error: %s", webhook_info.last_error_message)
                 
         except Exception as e:
-            logger.error(f"❌ Failed to set webhook: {str(e)}")
-            logger.error(f"   Webhook URL: {webhook_url}")
-            logger.error(f"   Please check:")
-            logger.error(f"   1. WEBHOOK_HOST is correct and DNS resolves: {WEBHOOK_HOST}")
-            logger.error(f"   2. Server is accessible from internet (not localhost)")
-            logger.error(f"   3. HTTPS is properly configured")
+            logger.error("❌ Failed to set webhook: %s", e)
+            logger.error("   Webhook URL: %s", webhook_url)
+            logger.error("   Please check:")
+            logger.error("   1. WEBHOOK_HOST is correct and DNS resolves: %s", config.webhook_host)
+            logger.error("   2. Server is accessible from internet (not localhost)")
+            logger.error("   3. HTTPS is properly configured")
             raise
     else:
         # Delete webhook if exists (when switching from prod to dev)
@@ -97,7 +97,7 @@ async def on_startup(bot: Bot):
             await bot.delete_webhook()
             logger.info("Webhook deleted (using polling mode)")
         except Exception as e:                                                                                                                                                                                                                                                                                                              
-            logger.warning(f"Failed to delete webhook: {str(e)}")
+            logger.warning("Failed to delete webhook: %s", e)
 
 
 async def on_shutdown(bot: Bot):
@@ -107,9 +107,15 @@ async def on_shutdown(bot: Bot):
     # Close bot session
     await bot.session.close()
     
+    # Close shared API session
+    from api_client import close_session
+    await close_session()
+    
     # Close Redis connection
     from storage import user_storage
     await user_storage.close()
+    from cache import response_cache
+    await response_cache.close()
     
     logger.info("Bot shutdown complete")
 
@@ -117,25 +123,20 @@ async def on_shutdown(bot: Bot):
 async def main():
     """Main function to run the bot."""
     # Initialize bot and dispatcher
-    bot = Bot(token=BOT_TOKEN)
-    storage = MemoryStorage()
+    # Decode Telegram API replies with orjson instead of stdlib json
+    bot = Bot(token=config.bot_token, session=AiohttpSession(json_loads=orjson.loads))
+    # FSM state lives in Redis so it survives restarts and is shared between replicas
+    storage = RedisStorage.from_url(config.redis_url, state_ttl=FSM_TTL, data_ttl=FSM_TTL)
     dp = Dispatcher(storage=storage)
     
     # Register routers
-    dp.include_router(auth.router)
-    dp.include_router(students.router)
-    dp.include_router(groups.router)
-    dp.include_router(payments.router)
-    dp.include_router(employees.router)
-    dp.include_router(attendance.router)
-    dp.include_router(common.router)
-    dp.include_router(documents.router)
+    dp.include_routers(*ROUTERS)
     
     runner = None
     try:
-        if BOT_MODE == 'prod':
+        if config.bot_mode == 'prod':
             # Production mode: use webhook
-            logger.info(f"Starting bot in PRODUCTION mode (webhook) on port {WEBHOOK_PORT}")
+            logger.info("Starting bot in PRODUCTION mode (webhook) on port %s", config.webhook_port)
             
             # Run startup actions
             await on_startup(bot)
@@ -144,12 +145,15 @@ async def main():
             app = web.Application()
             
             # Register webhook handler
+            # Answer Telegram right away and process the update in its own task,
+            # so a slow backend call never holds up delivery of other updates
             webhook_requests_handler = SimpleRequestHandler(
                 dispatcher=dp,
                 bot=bot,
-                secret_token=WEBHOOK_SECRET
+                secret_token=config.webhook_secret,
+                handle_in_background=True
             )
-            webhook_requests_handler.register(app, path=WEBHOOK_PATH)
+            webhook_requests_handler.register(app, path=config.webhook_path)
             
             # Setup application
             setup_application(app, dp, bot=bot)
@@ -157,11 +161,11 @@ async def main():
             # Create runner
             runner = web.AppRunner(app)
             await runner.setup()
-            site = web.TCPSite(runner, host='0.0.0.0', port=WEBHOOK_PORT)
+            site = web.TCPSite(runner, host='0.0.0.0', port=config.webhook_port)
             await site.start()
             
-            logger.info(f"Webhook server started on http://0.0.0.0:{WEBHOOK_PORT}{WEBHOOK_PATH}")
-            logger.info(f"Webhook URL: {WEBHOOK_HOST}{WEBHOOK_PATH}")
+            logger.info("Webhook server started on http://0.0.0.0:%s%s", config.webhook_port, config.webhook_path)
+            logger.info("Webhook URL: %s%s", config.webhook_host, config.webhook_path)
             
             # Keep the server running
             try:
@@ -176,26 +180,33 @@ async def main():
         else:
             # Development mode: use polling
             logger.info("Starting bot in DEVELOPMENT mode (polling)")
+            # Each update runs in its own task, so polling keeps going while
+            # handlers wait on the backend
             await dp.start_polling(
                 bot,
+                handle_as_tasks=True,
                 allowed_updates=dp.resolve_used_update_types(),
                 on_startup=on_startup,
                 on_shutdown=on_shutdown
             )
 
     except Exception as e:
-        logger.error(f"Error starting bot: {str(e)}", exc_info=True)
-        if BOT_MODE == 'prod' and runner:
+        logger.error("Error starting bot: %s", e, exc_info=True)
+        if config.bot_mode == 'prod' and runner:
             try:
                 await runner.cleanup()
             except:
                 pass
         await on_shutdown(bot)
         raise
+    finally:
+        await storage.close()
 
 
 if __name__ == '__main__':
+    # Use the libuv-based event loop when available
+    run = uvloop.run if uvloop else asyncio.run
     try:
-        asyncio.run(main())
+        run(main())
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
@@ -0,0 +1,141 @@
+"""Short-lived Redis cache for backend API responses."""
+import asyncio
+from functools import wraps
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Set, Union, Any
+import orjson
+import redis.asyncio as redis
+from config import config
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Default lifetime of a cached response, in seconds
+CACHE_TTL = 30
+
+
+class ResponseCache:
+    """Redis cache of GET responses, grouped by owner.
+
+    The owner is a shared name such as 'employees' or the name of a
+    redis_cached method. All entries of an owner live in one hash, so they
+    are dropped together with a single DEL.
+    """
+
+    def __init__(self):
+        self.redis_client: Optional[redis.Redis] = None
+        self._redis_url = config.redis_url
+
+    async def _get_redis(self) -> redis.Redis:
+        """Get or create Redis client."""
+        if self.redis_client is None:
+            self.redis_client = await redis.from_url(
+                self._redis_url,
+                decode_responses=True,
+                encoding="utf-8"
+            )
+        return self.redis_client
+
+    def _get_key(self, owner: Union[int, str, None]) -> str:
+        """Get Redis key for owner's cached responses."""
+        return f"bot:cache:{owner}"
+
+    async def get_json(self, owner: Union[int, str, None], field: str) -> Optional[Any]:
+        """Return a cached response or None."""
+        try:
+            redis_client = await self._get_redis()
+            raw = await redis_client.hget(self._get_key(owner), field)
+            return orjson.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning("Response cache read failed: %s", e)
+            return None
+
+    async def set_json(self, owner: Union[int, str, None], field: str, value: Any, ttl: int = CACHE_TTL):
+        """Store a response; the owner's entries expire at most ttl seconds after the first one."""
+        try:
+            redis_client = await self._get_redis()
+            key = self._get_key(owner)
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, field, orjson.dumps(value))
+                pipe.expire(key, ttl, nx=True)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Response cache write failed: %s", e)
+
+    async def delete(self, *owners: Union[int, str, None]):
+        """Drop all cached responses of the given owners."""
+        try:
+            redis_client = await self._get_redis()
+            await redis_client.delete(*(self._get_key(owner) for owner in owners))
+        except Exception as e:
+            logger.warning("Response cache invalidation failed: %s", e)
+
+    async def close(self):
+        """Close Redis connection."""
+        if self.redis_client:
+            await self.redis_client.close()
+            self.redis_client = None
+
+
+# Global cache instance
+response_cache = ResponseCache()
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key.
+
+    The first caller starts the coroutine in a task; callers arriving before
+    it finishes await the same task and get the same result (or exception).
+    Keys should include the user, so one user's error never reaches another.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+        # Shield so a cancelled caller doesn't cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark it retrieved so a call every caller gave up on doesn't log a warning
+            task.exception()
+
+
+# Owners (method names) of the redis_cached responses; any backend write
+# drops them all, for every user
+REDIS_CACHED_OWNERS: Set[str] = set()
+
+
+def redis_cached(ttl: int = CACHE_TTL):
+    """Cache an APIClient GET method's response per user for ttl seconds.
+
+    Entries of all users live under the method's name, so a write by one user
+    invalidates what the others have cached as well.
+    """
+    def decorator(func):
+        owner = func.__name__
+        REDIS_CACHED_OWNERS.add(owner)
+
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            if self.user_id is None:
+                return await func(self, *args, **kwargs)
+            field = str(self.user_id)
+            if args or kwargs:
+                field = f"{field}:{args}:{sorted(kwargs.items())}"
+            cached = await response_cache.get_json(owner, field)
+            if cached is not None:
+                return cached
+            response = await func(self, *args, **kwargs)
+            if isinstance(response, dict) and response.get('success') is not False:
+                await response_cache.set_json(owner, field, response, ttl)
+            return response
+        return wrapper
+    return decorator
@@ -1,32 +1,55 @@
 """Configuration settings for the bot."""
 import os
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
 env_path = Path(__file__).parent / '.env'
-load_dotenv(dotenv_path=env_path)
-
-# Telegram Bot Configuration
-BOT_TOKEN = os.getenv('BOT_TOKEN')
-if not BOT_TOKEN:
-    raise ValueError("BOT_TOKEN environment variable is required")
-
-# Bot Mode Configuration
-# Options: 'dev' (polling) or 'prod' (webhook)
-BOT_MODE = os.getenv('BOT_MODE', 'dev').lower()
-
-# Webhook Configuration (for prod mode)
-WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', 'https://bot.bimuz.uz')
-WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/webhook')
-WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', None)  # Optional secret token
-WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', '8443'))
-
-# Backend API Configuration
-# Use external URL for production (same as dashboard)
-# External: use 'https://api.bimuz.uz'
-# Internal (for local dev): use 'http://api:8000' or 'http://localhost:8000'
-API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:8000').rstrip('/')
-
-# Redis Configuration (optional)
-REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Immutable bot settings, read once from the environment at import time."""
+    bot_token: str
+    bot_mode: str
+    webhook_host: str
+    webhook_path: str
+    webhook_secret: Optional[str]
+    webhook_port: int
+    api_base_url: str
+    redis_url: str
+
+
+def _load() -> Config:
+    """Parse .env and the environment once per process."""
+    # Load environment variables from .env file
+    load_dotenv(dotenv_path=env_path)
+
+    # Telegram Bot Configuration
+    bot_token = os.getenv('BOT_TOKEN')
+    if not bot_token:
+        raise ValueError("BOT_TOKEN environment variable is required")
+
+    return Config(
+        bot_token=bot_token,
+        # Bot Mode Configuration
+        # Options: 'dev' (polling) or 'prod' (webhook)
+        bot_mode=os.getenv('BOT_MODE', 'dev').lower(),
+        # Webhook Configuration (for prod mode)
+        webhook_host=os.getenv('WEBHOOK_HOST', 'https://bot.bimuz.uz'),
+        webhook_path=os.getenv('WEBHOOK_PATH', '/webhook'),
+        webhook_secret=os.getenv('WEBHOOK_SECRET', None),  # Optional secret token
+        webhook_port=int(os.getenv('WEBHOOK_PORT', '8443')),
+        # Backend API Configuration
+        # Use external URL for production (same as dashboard)
+        # External: use 'https://api.bimuz.uz'
+        # Internal (for local dev): use 'http://api:8000' or 'http://localhost:8000'
+        api_base_url=os.getenv('API_BASE_URL', 'http://localhost:8000').rstrip('/'),
+        # Redis Configuration (optional)
+        redis_url=os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+    )
+
+
+config = _load()
+
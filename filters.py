@@ -0,0 +1,16 @@
+"""Custom aiogram filters."""
+from typing import Callable, Optional, Union
+from aiogram.filters import BaseFilter
+from aiogram.types import CallbackQuery, Message
+from storage import user_storage
+
+
+class RoleFilter(BaseFilter):
+    """Pass only logged-in users whose role satisfies `check`."""
+
+    def __init__(self, check: Callable[[Optional[str]], bool]):
+        self.check = check
+
+    async def __call__(self, event: Union[Message, CallbackQuery]) -> bool:
+        session = await user_storage.get_session(event.from_user.id)
+        return session is not None and self.check(session.role)
@@ -1 +1,28 @@
 """Handlers package."""
+from handlers import (
+    auth,
+    students,
+    groups,
+    payments,
+    employees,
+    attendance,
+    common,
+    documents,
+    menu
+)
+
+# Routers registered in the dispatcher, in priority order.
+# The main menu comes right after auth so its buttons work from any
+# section's FSM state, but never interrupt the login flow.
+# NOTE: reports.router is intentionally not registered (financial info).
+ROUTERS = (
+    auth.router,
+    menu.router,
+    students.router,
+    groups.router,
+    payments.router,
+    employees.router,
+    attendance.router,
+    common.router,
+    documents.router,
+)
@@ -1,7 +1,7 @@
 """Attendance handlers."""
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
-from api_client import APIClient
+from api_client import get_api_client
 from storage import user_storage
 from keyboards import get_main_menu_keyboard
 from utils import extract_list_from_response, truncate_message, truncate_alert_message
@@ -12,77 +12,100 @@ logger = logging.getLogger(__name__)
 
 router = Router()
 
+# Stop adding rows once the list text reaches this size (Telegram limit is 4096)
+LIST_TEXT_BUDGET = 3800
+
+ATTENDANCE_ROW = "📅 {} - {}\n   Mentor: {}\n   Qatnashganlar: {}\n\n"
+
+# Number of attendances shown in the list preview
+PREVIEW_SIZE = 10
+
+
+def _format_attendances(attendances: list, mentor_map: dict) -> str:
+    """Render the attendances list preview (pure, no I/O)."""
+    parts = [f"📋 **Davomatlar ro'yxati** ({len(attendances)} ta)\n\n"]
+    size = len(parts[0])
+    
+    for attendance in attendances[:PREVIEW_SIZE]:
+        get = attendance.get
+        date = get('date')
+        gid = get('group')
+        chunk = ATTENDANCE_ROW.format(
+            date[:10] if date else 'N/A',
+            get('group_name', 'N/A'),
+            get('mentor_name') or (mentor_map.get(gid) if gid else None) or 'N/A',
+            len(get('participants') or ())
+        )
+        size += len(chunk)
+        if size > LIST_TEXT_BUDGET:
+            parts.append("…")
+            break
+        parts.append(chunk)
+    else:
+        if len(attendances) > PREVIEW_SIZE:
+            parts.append(f"... va yana {len(attendances) - PREVIEW_SIZE} ta")
+    
+    return "".join(parts)
+
 
-@router.message(F.text == "📋 Davomatlar")
 async def cmd_attendances(message: Message):
     """Show attendances list."""
     user_id = message.from_user.id
+    session = await user_storage.get_session(user_id)
     
-    if not await user_storage.is_authenticated(user_id):
+    if not session:
         await message.answer("Siz tizimga kirmagansiz. Kirish uchun /start buyrug'ini bosing.")
         return
     
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
-    
-    if not can_view_attendance(role):
+    if not can_view_attendance(session.role):
         await message.answer("❌ Bu bo'limga kirish uchun ruxsat yo'q.")
         return
     
-    access_token = await user_storage.get_access_token(user_id)
-    
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_attendances()
-            attendances = extract_list_from_response(response)
+        client = get_api_client(session.access_token, user_id)
+        response = await client.get_attendances(expand='mentor')
+        attendances = extract_list_from_response(response)
+        
+        if not attendances:
+            await message.answer(
+                "📋 Davomatlar ro'yxati bo'sh.\n\n"
+                "Yangi davomat qo'shish uchun guruh bo'limidan foydalaning."
+            )
+        else:
+            # Build a small cache for group -> mentor_name (avoid N+1)
+            group_mentor_cache = {}
+            preview_attendances = attendances[:PREVIEW_SIZE]
+            for a in preview_attendances:
+                # Some API responses might already include mentor_name
+                if a.get('group') and a.get('mentor_name'):
+                    group_mentor_cache.setdefault(a['group'], a['mentor_name'])
             
-            if not attendances:
-                await message.answer(
-                    "📋 Davomatlar ro'yxati bo'sh.\n\n"
-                    "Yangi davomat qo'shish uchun guruh bo'limidan foydalaning."
+            # Backends without ?expand=mentor support leave mentor_name out;
+            # fetch the remaining groups concurrently instead of one by one
+            missing_gids = list({
+                a['group'] for a in preview_attendances if a.get('group')
+            } - group_mentor_cache.keys())
+            if missing_gids:
+                g_responses = await client.batch(
+                    *(client.get_group(gid) for gid in missing_gids),
+                    return_exceptions=True
                 )
-            else:
-                text = f"📋 **Davomatlar ro'yxati** ({len(attendances)} ta)\n\n"
+                for gid, g_resp in zip(missing_gids, g_responses):
+                    if isinstance(g_resp, dict) and g_resp.get('success'):
+                        g_data = g_resp.get('data', {}) or {}
+                        group_mentor_cache[gid] = g_data.get('mentor_name') or g_data.get('mentor') or 'N/A'
+                    else:
+                        group_mentor_cache[gid] = 'N/A'
 
-                # Build a small cache for group -> mentor_name (avoid N+1)
-                group_mentor_cache = {}
-                preview_attendances = attendances[:10]  # Show first 10
-                for a in preview_attendances:
-                    gid = a.get('group')
-                    if gid and gid not in group_mentor_cache:
-                        # Some API responses might already include mentor_name
-                        if a.get('mentor_name'):
-                            group_mentor_cache[gid] = a.get('mentor_name')
-                            continue
-                        try:
-                            g_resp = await client.get_group(gid)
-                            if isinstance(g_resp, dict) and g_resp.get('success'):
-                                g_data = g_resp.get('data', {}) or {}
-                                group_mentor_cache[gid] = g_data.get('mentor_name') or g_data.get('mentor') or 'N/A'
-                            else:
-                                group_mentor_cache[gid] = 'N/A'
-                        except Exception:
-                            group_mentor_cache[gid] = 'N/A'
-
-                for attendance in preview_attendances:
-                    group_name = attendance.get('group_name', 'N/A')
-                    date = attendance.get('date', 'N/A')[:10] if attendance.get('date') else 'N/A'
-                    participants_count = len(attendance.get('participants', []))
-                    gid = attendance.get('group')
-                    mentor_name = attendance.get('mentor_name') or (group_mentor_cache.get(gid) if gid else None) or 'N/A'
-                    
-                    text += f"📅 {date} - {group_name}\n"
-                    text += f"   Mentor: {mentor_name}\n"
-                    text += f"   Qatnashganlar: {participants_count}\n\n"
-                
-                if len(attendances) > 10:
-                    text += f"... va yana {len(attendances) - 10} ta"
-                
-                # Ensure text doesn't exceed Telegram's limit
-                text = truncate_message(text, max_length=4000)
-                await message.answer(text, parse_mode="Markdown")
+            # At most PREVIEW_SIZE rows - cheap enough to format on the event loop.
+            # Ensure text doesn't exceed Telegram's limit
+            text = truncate_message(
+                _format_attendances(attendances, group_mentor_cache),
+                max_length=4000
+            )
+            await message.answer(text, parse_mode="Markdown")
     except Exception as e:
-        logger.error(f"Attendances list error: {str(e)}")
+        logger.error("Attendances list error: %s", e)
         await message.answer(f"❌ Xatolik: {str(e)}")
 
 
@@ -91,46 +114,47 @@ async def show_group_attendance(callback: CallbackQuery):
     """Show attendance for a specific group."""
     group_id = int(callback.data.split("_")[2])
     user_id = callback.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
+    session = await user_storage.get_session(user_id)
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            # Get group info
-            group_response = await client.get_group(group_id)
-            if not group_response.get('success'):
-                await callback.answer("Guruh topilmadi", show_alert=True)
-                return
-            
-            group = group_response.get('data', {})
+        client = get_api_client(session.access_token if session else None, user_id)
+        # Group info and its attendances are independent - fetch them together
+        group_response, attendances_response = await client.batch(
+            client.get_group(group_id),
+            client.get_attendances(group=group_id)
+        )
+        if not group_response.get('success'):
+            await callback.answer("Guruh topilmadi", show_alert=True)
+            return
+        
+        group = group_response.get('data', {})
+        
+        all_attendances = extract_list_from_response(attendances_response)
+        
+        if all_attendances:
+            # The backend filters by ?group=; keep the check in case it ignores the param
+            group_attendances = [
+                att for att in all_attendances
+                if att.get('group') == group_id
+            ]
             
-            # Get attendances for this group
-            attendances_response = await client.get_attendances()
-            all_attendances = extract_list_from_response(attendances_response)
+            text = f"📋 **Davomat: {group.get('speciality_display', 'Guruh')}**\n\n"
             
-            if all_attendances:
-                
-                group_attendances = [
-                    att for att in all_attendances
-                    if att.get('group') == group_id
-                ]
-                
-                text = f"📋 **Davomat: {group.get('speciality_display', 'Guruh')}**\n\n"
-                
-                if not group_attendances:
-                    text += "Hozircha davomat qayd etilmagan."
-                else:
-                    for att in group_attendances[:5]:
-                        date = att.get('date', 'N/A')[:10] if att.get('date') else 'N/A'
-                        participants_count = len(att.get('participants', []))
-                        text += f"📅 {date}: {participants_count} ta qatnashgan\n"
-                
-                # Ensure text doesn't exceed Telegram's limit
-                text = truncate_message(text, max_length=4000)
-                await callback.message.answer(text, parse_mode="Markdown")
+            if not group_attendances:
+                text += "Hozircha davomat qayd etilmagan."
             else:
-                await callback.message.answer("Hozircha davomat qayd etilmagan.")
-            await callback.answer()
+                for att in group_attendances[:5]:
+                    date = att.get('date', 'N/A')[:10] if att.get('date') else 'N/A'
+                    participants_count = len(att.get('participants', []))
+                    text += f"📅 {date}: {participants_count} ta qatnashgan\n"
+            
+            # Ensure text doesn't exceed Telegram's limit
+            text = truncate_message(text, max_length=4000)
+            await callback.message.answer(text, parse_mode="Markdown")
+        else:
+            await callback.message.answer("Hozircha davomat qayd etilmagan.")
+        await callback.answer()
     except Exception as e:
-        logger.error(f"Group attendance error: {str(e)}")
+        logger.error("Group attendance error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
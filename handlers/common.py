@@ -3,6 +3,7 @@ from aiogram import Router, F
 from aiogram.types import CallbackQuery
 from storage import user_storage
 from keyboards import get_main_menu_keyboard
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,20 +14,21 @@ router = Router()
 @router.callback_query(F.data == "back_to_menu")
 async def back_to_menu(callback: CallbackQuery):
     """Go back to main menu."""
-    user_id = callback.from_user.id
+    session = await user_storage.get_session(callback.from_user.id)
     
-    if not await user_storage.is_authenticated(user_id):
+    if not session:
         await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
         return
     
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
-    
-    await callback.message.answer(
-        "🏠 **Asosiy menyu**\n\n"
-        "Quyidagi bo'limlardan birini tanlang:",
-        reply_markup=get_main_menu_keyboard(role),
-        parse_mode="Markdown"
+    # A reply keyboard can't be attached via edit_text, so send a new message;
+    # the three Bot API calls are independent and run concurrently
+    await asyncio.gather(
+        callback.message.answer(
+            "🏠 **Asosiy menyu**\n\n"
+            "Quyidagi bo'limlardan birini tanlang:",
+            reply_markup=get_main_menu_keyboard(session.role),
+            parse_mode="Markdown"
+        ),
+        callback.message.delete(),
+        callback.answer()
     )
-    await callback.message.delete()
-    await callback.answer()
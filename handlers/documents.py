@@ -1,5 +1,5 @@
 """Documents handlers."""
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.types import Message
 from api_client import APIClient
 from storage import user_storage
@@ -11,30 +11,26 @@ logger = logging.getLogger(__name__)
 
 router = Router()
 
+DOCUMENTS_TEXT = (
+    "📁 <b>Hujjatlar</b>\n\n"
+    "Bu bo'lim hozircha ishlab chiqilmoqda.\n\n"
+    "Tez orada quyidagi hujjatlar mavjud bo'ladi:\n"
+    "• Shartnomalar\n"
+    "• Sertifikatlar\n"
+    "• Boshqa hujjatlar"
+)
+
 
-@router.message(F.text == "📁 Hujjatlar")
 async def cmd_documents(message: Message):
     """Show documents menu."""
-    user_id = message.from_user.id
+    session = await user_storage.get_session(message.from_user.id)
     
-    if not await user_storage.is_authenticated(user_id):
+    if not session:
         await message.answer("Siz tizimga kirmagansiz. Kirish uchun /start buyrug'ini bosing.")
         return
     
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
-    
-    text = (
-        "📁 <b>Hujjatlar</b>\n\n"
-        "Bu bo'lim hozircha ishlab chiqilmoqda.\n\n"
-        "Tez orada quyidagi hujjatlar mavjud bo'ladi:\n"
-        "• Shartnomalar\n"
-        "• Sertifikatlar\n"
-        "• Boshqa hujjatlar"
-    )
-    
     await message.answer(
-        text,
-        reply_markup=get_main_menu_keyboard(role),
+        DOCUMENTS_TEXT,
+        reply_markup=get_main_menu_keyboard(session.role),
         parse_mode="HTML"
     )
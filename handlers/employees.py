@@ -3,11 +3,22 @@
 RBAC is centralized in permissions.py (same strategy as dashboard).
 All authenticated roles can READ employees, but CRUD is role-based.
 """
+import asyncio
+import hashlib
+import hmac
+import os
+from functools import lru_cache
 from aiogram import Router, F
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from api_client import APIClient
+from typing import Any, Awaitable, Optional, Set, Tuple, Union
+from api_client import APIClient, APIError, get_api_client
+from cache import SingleFlight, response_cache
+from filters import RoleFilter
+from middlewares import ThrottlingMiddleware
 from storage import user_storage
 from keyboards import (
     get_employees_list_keyboard,
@@ -16,7 +27,7 @@ from keyboards import (
     get_cancel_keyboard,
     get_cancel_inline_keyboard
 )
-from utils import extract_list_from_response, truncate_message, truncate_alert_message, safe_html_text, format_error_message
+from utils import extract_list_from_response, truncate_message, truncate_alert_message, safe_html_text, format_error_message, is_valid_email
 import logging
 from permissions import (
     can_view_employees,
@@ -30,6 +41,18 @@ logger = logging.getLogger(__name__)
 
 router = Router()
 
+# Pagination clicks within 300 ms of the previous identical click are dropped
+PAGINATION_THROTTLE_RATE = 0.3
+
+
+def _pagination_throttle_key(callback: CallbackQuery) -> Optional[str]:
+    if callback.data and callback.data.startswith("employees_page_"):
+        return f"{callback.from_user.id}:{callback.data}"
+    return None
+
+
+router.callback_query.middleware(ThrottlingMiddleware(PAGINATION_THROTTLE_RATE, _pagination_throttle_key))
+
 
 class CreateEmployeeStates(StatesGroup):
     waiting_for_email = State()
@@ -47,68 +70,252 @@ class EditEmployeeStates(StatesGroup):
     waiting_for_value = State()
 
 
-@router.message(F.text == "👨‍💼 Xodimlar")
+ROLE_NAMES_EMOJI = {
+    'dasturchi': '👨‍💻 Dasturchi',
+    'direktor': '👔 Direktor',
+    'administrator': '👨‍💼 Administrator',
+    'mentor': '👨‍🏫 Mentor',
+    'sotuv_agenti': '👨‍💼 Sotuv Agenti',
+    'assistent': '👨‍🎓 Assistent',
+    'buxgalter': '💰 Buxgalter'
+}
+ROLE_NAMES_PLAIN = {
+    'dasturchi': 'Dasturchi',
+    'direktor': 'Direktor',
+    'administrator': 'Administrator',
+    'mentor': 'Mentor',
+    'sotuv_agenti': 'Sotuv Agenti',
+    'assistent': 'Assistent',
+    'buxgalter': 'Buxgalter'
+}
+CANCEL_CREATE_INLINE_BUTTON = InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_create_employee")
+CANCEL_EDIT_INLINE_BUTTON = InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_edit_employee")
+
+
+@lru_cache(maxsize=32)
+def _role_keyboard(current_role: Optional[str], mode: str) -> InlineKeyboardMarkup:
+    """Roles the current role may assign; mode is 'create' or 'edit'."""
+    if mode == 'create':
+        prefix, cancel = "role_", CANCEL_CREATE_INLINE_BUTTON
+    else:
+        prefix, cancel = "edit_role_", CANCEL_EDIT_INLINE_BUTTON
+    rows = [
+        [InlineKeyboardButton(text=ROLE_NAMES_EMOJI.get(r, r), callback_data=f"{prefix}{r}")]
+        for r in get_assignable_roles(current_role)
+    ]
+    rows.append([cancel])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+EMPLOYEE_DETAIL_TEMPLATE = (
+    "👨‍💼 <b>Xodim ma'lumotlari</b>\n\n"
+    "<b>ID:</b> {id}\n"
+    "<b>Ism:</b> {full_name}\n"
+    "<b>Email:</b> {email}\n"
+    "<b>Rol:</b> {role}\n"
+    "{professionality}"
+    "\n<b>Holat:</b> {status}"
+)
+EMPLOYEE_CREATED_TEMPLATE = (
+    "✅ Xodim muvaffaqiyatli qo'shildi!\n\n"
+    "<b>Ism:</b> {full_name}\n"
+    "<b>Email:</b> {email}\n"
+    "<b>Rol:</b> {role}\n\n"
+    "⚠️ Eslatma: Yangi xodim o'z parolini o'zgartirishi tavsiya etiladi."
+)
+EMPLOYEE_DELETE_CONFIRM_TEMPLATE = (
+    "⚠️ <b>Xodimni o'chirish</b>\n\n"
+    "<b>Xodim:</b> {full_name}\n"
+    "<b>ID:</b> {id}\n\n"
+    "⚠️ Bu amalni bekor qilib bo'lmaydi!\n\n"
+    "Xodimni o'chirishni tasdiqlaysizmi?"
+)
+# Field menu of the edit flow, keyed by the employee's current is_active
+EDIT_EMPLOYEE_PROMPTS = {
+    is_active: (
+        "✏️ <b>Xodimni tahrirlash</b>\n\n"
+        "Qaysi maydonni tahrirlamoqchisiz?\n\n"
+        "1️⃣ To'liq ism\n"
+        "2️⃣ Rol\n"
+        "3️⃣ Mutaxassislik\n"
+        f"4️⃣ {'Profilni bloklash' if is_active else 'Profilni aktivlashtirish'}\n\n"
+        "Raqam yuboring yoki 'Bekor qilish' tugmasini bosing."
+    )
+    for is_active in (True, False)
+}
+EMPLOYEES_LIST_HEADER = "👨‍💼 <b>Xodimlar ro'yxati</b> ({} ta)\n\nQuyidagilardan birini tanlang:"
+EMPLOYEE_PROFESSIONALITY_LINE = "<b>Mutaxassislik:</b> {}\n"
+# Fields of an employee read by the detail view, in unpacking order
+EMPLOYEE_FIELDS = ('id', 'full_name', 'email', 'role', 'role_display', 'professionality', 'is_active')
+
+
+# Employee responses are cached per user (the backend scopes them by the
+# caller's permissions) and dropped whenever an employee is created/updated/deleted
+EMPLOYEES_CACHE = 'employees'
+EMPLOYEES_CACHE_TTL = 60
+
+
+ERR_PERMISSION = "❌ Ruxsat yo'q."
+ERR_EMPLOYEE_NOT_FOUND = "❌ Xodim topilmadi."
+
+
+def api_error_alert(error: APIError) -> str:
+    """Alert text for a backend error response."""
+    if error.status == 403:
+        return ERR_PERMISSION
+    if error.status == 404:
+        return ERR_EMPLOYEE_NOT_FOUND
+    return truncate_alert_message(f"Xatolik: {error.message}")
+
+
+async def _report_api_error(target: Union[CallbackQuery, Message], error: APIError, context: str) -> None:
+    """Log a backend error and show it to the user.
+
+    These are expected backend refusals (permission, not found, ...), so no
+    traceback is logged. A callback gets an alert, a message gets a reply.
+    """
+    logger.warning("%s API error: %s", context, error)
+    if isinstance(target, CallbackQuery):
+        await target.answer(api_error_alert(error), show_alert=True)
+    else:
+        await target.answer(api_error_alert(error))
+
+
+# Strong references to background tasks, so they aren't garbage collected mid-flight
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _log_task_error(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background task failed: %s", task.exception(), exc_info=task.exception())
+
+
+def fire_and_forget(coro: Awaitable[Any]) -> None:
+    """Run a non-critical Bot API call (e.g. a plain callback ack) in the background."""
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_log_task_error)
+
+
+async def edit_and_answer(callback: CallbackQuery, edit: Awaitable[Any]) -> None:
+    """Edit the callback's message, then acknowledge the callback in the background.
+
+    A callback query can be answered only once, so a failed edit leaves it
+    unanswered for the caller's error alert.
+    """
+    try:
+        await edit
+    except TelegramBadRequest as e:
+        # A repeated click re-renders the same content; nothing changed
+        if "message is not modified" not in str(e):
+            raise
+    fire_and_forget(callback.answer())
+
+
+# Concurrent cache misses for the same entry share one API request
+_employees_flight = SingleFlight()
+
+
+async def get_employees_list(client: APIClient) -> list:
+    """Get the user's employees list, from the cache when possible."""
+    field = f"{client.user_id}:list"
+    employees = await response_cache.get_json(EMPLOYEES_CACHE, field)
+    if employees is not None:
+        return employees
+    
+    async def fetch() -> list:
+        employees = extract_list_from_response(await client.get_employees())
+        await response_cache.set_json(EMPLOYEES_CACHE, field, employees, EMPLOYEES_CACHE_TTL)
+        return employees
+    
+    return await _employees_flight.do(field, fetch)
+
+
+async def get_employee_response(client: APIClient, employee_id: int) -> dict:
+    """Get a single employee response for the user, from the cache when possible."""
+    field = f"{client.user_id}:{employee_id}"
+    response = await response_cache.get_json(EMPLOYEES_CACHE, field)
+    if response is not None:
+        return response
+    
+    async def fetch() -> dict:
+        response = await client.get_employee(employee_id)
+        if response.get('success'):
+            await response_cache.set_json(EMPLOYEES_CACHE, field, response, EMPLOYEES_CACHE_TTL)
+        return response
+    
+    return await _employees_flight.do(field, fetch)
+
+
 async def cmd_employees(message: Message):
     """Show employees list (read allowed for all authenticated roles)."""
     user_id = message.from_user.id
+    session = await user_storage.get_session(user_id)
     
-    if not await user_storage.is_authenticated(user_id):
+    if not session:
         await message.answer("Siz tizimga kirmagansiz. Kirish uchun /start buyrug'ini bosing.")
         return
     
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    access_token, role = session.access_token, session.role
     
     if not can_view_employees(role):
         await message.answer("❌ Bu bo'limga kirish uchun ruxsat yo'q.")
         return
     
-    access_token = await user_storage.get_access_token(user_id)
-    
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_employees()
-            employees = extract_list_from_response(response)
-            
-            if not employees:
-                await message.answer(
-                    "👨‍💼 Xodimlar ro'yxati bo'sh.\n\n"
-                    "Yangi xodim qo'shish uchun quyidagi tugmani bosing:",
-                    reply_markup=get_employees_list_keyboard([], page=0, role=role)
-                )
-            else:
-                text = f"👨‍💼 <b>Xodimlar ro'yxati</b> ({len(employees)} ta)\n\n"
-                text += "Quyidagilardan birini tanlang:"
-                await message.answer(
-                    text,
-                    reply_markup=get_employees_list_keyboard(employees, page=0, role=role),
-                    parse_mode="HTML"
-                )
+        client = get_api_client(access_token, user_id)
+        employees = await get_employees_list(client)
+        await user_storage.set_cached_employees(user_id, employees)
+        
+        if not employees:
+            await message.answer(
+                "👨‍💼 Xodimlar ro'yxati bo'sh.\n\n"
+                "Yangi xodim qo'shish uchun quyidagi tugmani bosing:",
+                reply_markup=get_employees_list_keyboard([], page=0, role=role)
+            )
+        else:
+            text = EMPLOYEES_LIST_HEADER.format(len(employees))
+            await message.answer(
+                text,
+                reply_markup=get_employees_list_keyboard(employees, page=0, role=role),
+                parse_mode="HTML"
+            )
+    except APIError as e:
+        await _report_api_error(message, e, "Employees list")
     except Exception as e:
-        logger.error(f"Employees list error: {str(e)}")
+        logger.exception("Employees list error: %s", e)
         await message.answer(f"❌ Xatolik: {str(e)}")
 
 
 @router.callback_query(F.data.startswith("employees_page_"))
 async def employees_pagination(callback: CallbackQuery):
     """Handle employees list pagination."""
-    page = int(callback.data.split("_")[-1])
+    page = int(callback.data.rpartition("_")[2])
     user_id = callback.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
+        return
+    access_token, role = session.access_token, session.role
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_employees()
-            employees = extract_list_from_response(response)
-            
-            await callback.message.edit_reply_markup(
+        # Page through the snapshot taken when the list was opened
+        employees = await user_storage.get_cached_employees(user_id)
+        if employees is None:
+            client = get_api_client(access_token, user_id)
+            employees = await get_employees_list(client)
+            await user_storage.set_cached_employees(user_id, employees)
+        
+        await edit_and_answer(
+            callback,
+            callback.message.edit_reply_markup(
                 reply_markup=get_employees_list_keyboard(employees, page=page, role=role)
             )
-            await callback.answer()
+        )
+    except APIError as e:
+        await _report_api_error(callback, e, "Employees pagination")
     except Exception as e:
-        logger.error(f"Employees pagination error: {str(e)}")
+        logger.exception("Employees pagination error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
@@ -116,47 +323,54 @@ async def employees_pagination(callback: CallbackQuery):
 @router.callback_query(F.data.startswith("employee_"))
 async def show_employee_detail(callback: CallbackQuery):
     """Show employee detail."""
-    employee_id = int(callback.data.split("_")[1])
+    employee_id = int(callback.data.removeprefix("employee_"))
     user_id = callback.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
+        return
+    access_token, role = session.access_token, session.role
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_employee(employee_id)
+        client = get_api_client(access_token, user_id)
+        response = await get_employee_response(client, employee_id)
+        
+        if response.get('success'):
+            employee_data = response.get('data', {})
+            get = employee_data.get
+            _e = safe_html_text
+            emp_id, full_name, email, target_role, role_display, professionality, is_active = (
+                get(key) for key in EMPLOYEE_FIELDS
+            )
             
-            if response.get('success'):
-                employee_data = response.get('data', {})
-                target_role = employee_data.get('role')
-                
-                text = (
-                    f"👨‍💼 <b>Xodim ma'lumotlari</b>\n\n"
-                    f"<b>ID:</b> {safe_html_text(employee_data.get('id'))}\n"
-                    f"<b>Ism:</b> {safe_html_text(employee_data.get('full_name'))}\n"
-                    f"<b>Email:</b> {safe_html_text(employee_data.get('email'))}\n"
-                    f"<b>Rol:</b> {safe_html_text(employee_data.get('role_display') or employee_data.get('role'))}\n"
-                )
-                
-                if employee_data.get('professionality'):
-                    text += f"<b>Mutaxassislik:</b> {safe_html_text(employee_data.get('professionality'))}\n"
-                
-                text += f"\n<b>Holat:</b> {'✅ Faol' if employee_data.get('is_active') else '❌ Nofaol'}"
-                
-                # Ensure text doesn't exceed Telegram's limit
-                text = truncate_message(text, max_length=4000)
-                await callback.message.edit_text(
+            professionality = _e(professionality)
+            text = EMPLOYEE_DETAIL_TEMPLATE.format(
+                id=_e(emp_id),
+                full_name=_e(full_name),
+                email=_e(email),
+                role=_e(role_display or target_role),
+                professionality=EMPLOYEE_PROFESSIONALITY_LINE.format(professionality) if professionality else '',
+                status='✅ Faol' if is_active else '❌ Nofaol',
+            )
+            
+            # Ensure text doesn't exceed Telegram's limit
+            text = truncate_message(text, max_length=4000)
+            await edit_and_answer(
+                callback,
+                callback.message.edit_text(
                     text,
                     reply_markup=get_employee_detail_keyboard(employee_id, role=role, target_role=target_role),
                     parse_mode="HTML"
                 )
-                await callback.answer()
-            else:
-                error_msg = response.get('message', 'Xatolik')
-                error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
-                await callback.answer(error_msg, show_alert=True)
+            )
+        else:
+            error_msg = response.get('message', 'Xatolik')
+            error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
+            await callback.answer(error_msg, show_alert=True)
+    except APIError as e:
+        await _report_api_error(callback, e, "Employee detail")
     except Exception as e:
-        logger.error(f"Employee detail error: {str(e)}")
+        logger.exception("Employee detail error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
@@ -165,65 +379,79 @@ async def show_employee_detail(callback: CallbackQuery):
 async def back_to_employees(callback: CallbackQuery):
     """Go back to employees list."""
     user_id = callback.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
+        return
+    access_token, role = session.access_token, session.role
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_employees()
-            employees = extract_list_from_response(response)
-            
-            text = f"👨‍💼 <b>Xodimlar ro'yxati</b> ({len(employees)} ta)\n\n"
-            text += "Quyidagilardan birini tanlang:"
-            
-            await callback.message.edit_text(
+        client = get_api_client(access_token, user_id)
+        employees = await get_employees_list(client)
+        await user_storage.set_cached_employees(user_id, employees)
+        
+        text = EMPLOYEES_LIST_HEADER.format(len(employees))
+        
+        await edit_and_answer(
+            callback,
+            callback.message.edit_text(
                 text,
                 reply_markup=get_employees_list_keyboard(employees, page=0, role=role),
                 parse_mode="HTML"
             )
-            await callback.answer()
+        )
+    except APIError as e:
+        await _report_api_error(callback, e, "Back to employees")
     except Exception as e:
-        logger.error(f"Back to employees error: {str(e)}")
+        logger.exception("Back to employees error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
 
-@router.callback_query(F.data == "create_employee")
+@router.callback_query(F.data == "create_employee", RoleFilter(can_create_employee))
 async def create_employee_start(callback: CallbackQuery, state: FSMContext):
     """Start creating a new employee."""
-    user_id = callback.from_user.id
-    
-    if not await user_storage.is_authenticated(user_id):
-        await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
-        return
-    
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
-    
-    if not can_create_employee(role):
-        await callback.answer("❌ Bu amalni bajarish uchun ruxsat yo'q.", show_alert=True)
-        return
-    
     await callback.message.answer(
         "Yangi xodim qo'shish\n\n"
         "Email manzilini kiriting:",
         reply_markup=get_cancel_keyboard()
     )
     await state.set_state(CreateEmployeeStates.waiting_for_email)
-    await callback.answer()
+    fire_and_forget(callback.answer())
+
+
+@router.callback_query(F.data == "create_employee")
+async def create_employee_denied(callback: CallbackQuery):
+    """Reached only when RoleFilter rejected the user above."""
+    # A logged-in user's session is cached in-process by the filter's read
+    if await user_storage.get_session(callback.from_user.id) is None:
+        await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
+        return
+    await callback.answer("❌ Bu amalni bajarish uchun ruxsat yo'q.", show_alert=True)
+
+
+# Cancel handlers are registered before the state handlers so they win
+@router.message(F.text == "❌ Bekor qilish", StateFilter(CreateEmployeeStates))
+async def cancel_create_employee(message: Message, state: FSMContext):
+    """Cancel employee creation from any of its steps."""
+    await state.clear()
+    await message.answer("Xodim qo'shish bekor qilindi.")
+
+
+@router.message(F.text == "❌ Bekor qilish", StateFilter(EditEmployeeStates))
+async def cancel_edit_employee(message: Message, state: FSMContext):
+    """Cancel employee editing from any of its steps."""
+    await state.clear()
+    session = await user_storage.get_session(message.from_user.id)
+    role = session.role if session else None
+    await message.answer("Tahrirlash bekor qilindi.", reply_markup=get_main_menu_keyboard(role))
 
 
 @router.message(CreateEmployeeStates.waiting_for_email)
 async def process_employee_email(message: Message, state: FSMContext):
     """Process email."""
-    if message.text == "❌ Bekor qilish":
-        await state.clear()
-        await message.answer("Xodim qo'shish bekor qilindi.")
-        return
-    
     email = message.text.strip()
-    if '@' not in email:
+    if not is_valid_email(email):
         await message.answer("Iltimos, to'g'ri email manzil kiriting:")
         return
     
@@ -235,11 +463,6 @@ async def process_employee_email(message: Message, state: FSMContext):
 @router.message(CreateEmployeeStates.waiting_for_first_name)
 async def process_employee_first_name(message: Message, state: FSMContext):
     """Process first name."""
-    if message.text == "❌ Bekor qilish":
-        await state.clear()
-        await message.answer("Xodim qo'shish bekor qilindi.")
-        return
-    
     await state.update_data(first_name=message.text.strip())
     await message.answer("Familiyani kiriting (last_name):")
     await state.set_state(CreateEmployeeStates.waiting_for_last_name)
@@ -248,11 +471,6 @@ async def process_employee_first_name(message: Message, state: FSMContext):
 @router.message(CreateEmployeeStates.waiting_for_last_name)
 async def process_employee_last_name(message: Message, state: FSMContext):
     """Process last name."""
-    if message.text == "❌ Bekor qilish":
-        await state.clear()
-        await message.answer("Xodim qo'shish bekor qilindi.")
-        return
-    
     await state.update_data(last_name=message.text.strip())
     await message.answer("To'liq ismini kiriting (full_name):")
     await state.set_state(CreateEmployeeStates.waiting_for_full_name)
@@ -261,73 +479,15 @@ async def process_employee_last_name(message: Message, state: FSMContext):
 @router.message(CreateEmployeeStates.waiting_for_full_name)
 async def process_employee_full_name(message: Message, state: FSMContext):
     """Process full name."""
-    if message.text == "❌ Bekor qilish":
-        await state.clear()
-        await message.answer("Xodim qo'shish bekor qilindi.")
-        return
-    
     await state.update_data(full_name=message.text.strip())
-    await message.answer("Parolni kiriting:")
-    await state.set_state(CreateEmployeeStates.waiting_for_password)
-
-
-@router.message(CreateEmployeeStates.waiting_for_password)
-async def process_employee_password(message: Message, state: FSMContext):
-    """Process password."""
-    if message.text == "❌ Bekor qilish":
-        await state.clear()
-        await message.answer("Xodim qo'shish bekor qilindi.")
-        return
-    
-    await state.update_data(password=message.text.strip())
-    await message.answer("Parolni tasdiqlang (password_confirm):")
-    await state.set_state(CreateEmployeeStates.waiting_for_password_confirm)
-
-
-@router.message(CreateEmployeeStates.waiting_for_password_confirm)
-async def process_employee_password_confirm(message: Message, state: FSMContext):
-    """Process password confirmation."""
-    if message.text == "❌ Bekor qilish":
-        await state.clear()
-        await message.answer("Xodim qo'shish bekor qilindi.")
-        return
-    
-    data = await state.get_data()
-    password = data.get('password')
-    password_confirm = message.text.strip()
-    
-    if password != password_confirm:
-        await message.answer("❌ Parollar mos kelmaydi. Qayta kiriting:")
-        await state.set_state(CreateEmployeeStates.waiting_for_password_confirm)
-        return
-    
-    await state.update_data(password_confirm=password_confirm)
     
     # Show role selection keyboard (filtered by permissions)
-    from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-    user_id = message.from_user.id
-    current_employee = await user_storage.get_employee(user_id)
-    current_role = current_employee.get('role') if current_employee else None
-
-    role_names = {
-        'dasturchi': '👨‍💻 Dasturchi',
-        'direktor': '👔 Direktor',
-        'administrator': '👨‍💼 Administrator',
-        'mentor': '👨‍🏫 Mentor',
-        'sotuv_agenti': '👨‍💼 Sotuv Agenti',
-        'assistent': '👨‍🎓 Assistent',
-        'buxgalter': '💰 Buxgalter'
-    }
+    session = await user_storage.get_session(message.from_user.id)
+    current_role = session.role if session else None
 
-    rows = []
-    for r in get_assignable_roles(current_role):
-        rows.append([InlineKeyboardButton(text=role_names.get(r, r), callback_data=f"role_{r}")])
-    rows.append([InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_create_employee")])
-    keyboard = InlineKeyboardMarkup(inline_keyboard=rows)
-    
     await message.answer(
         "Rolni tanlang:",
-        reply_markup=keyboard
+        reply_markup=_role_keyboard(current_role, 'create')
     )
     await state.set_state(CreateEmployeeStates.waiting_for_role)
 
@@ -335,84 +495,115 @@ async def process_employee_password_confirm(message: Message, state: FSMContext)
 @router.callback_query(F.data.startswith("role_"), CreateEmployeeStates.waiting_for_role)
 async def process_employee_role(callback: CallbackQuery, state: FSMContext):
     """Process role selection."""
-    role = callback.data.split("_")[1]  # role_dasturchi -> dasturchi
+    role = callback.data.removeprefix("role_")  # role_sotuv_agenti -> sotuv_agenti
     await state.update_data(role=role)
-    
-    role_names = {
-        'dasturchi': 'Dasturchi',
-        'direktor': 'Direktor',
-        'administrator': 'Administrator',
-        'mentor': 'Mentor',
-        'sotuv_agenti': 'Sotuv Agenti',
-        'assistent': 'Assistent',
-        'buxgalter': 'Buxgalter'
-    }
-    
-    await callback.message.edit_text(f"✅ Rol tanlandi: {role_names.get(role, role)}")
-    await callback.answer()
-    await callback.message.answer("Mutaxassislikni kiriting (ixtiyoriy, o'tkazib yuborish uchun 'skip' yozing):")
     await state.set_state(CreateEmployeeStates.waiting_for_professionality)
+    
+    # Confirmation and the next prompt go out as one edit
+    await edit_and_answer(
+        callback,
+        callback.message.edit_text(
+            f"✅ Rol tanlandi: {ROLE_NAMES_PLAIN.get(role, role)}\n\n"
+            "Mutaxassislikni kiriting (ixtiyoriy, o'tkazib yuborish uchun 'skip' yozing):"
+        ),
+    )
 
 
 @router.callback_query(F.data == "cancel_create_employee")
 async def cancel_create_employee_callback(callback: CallbackQuery, state: FSMContext):
     """Cancel employee creation."""
     await state.clear()
-    await callback.message.edit_text("Xodim qo'shish bekor qilindi.")
-    await callback.answer()
+    await edit_and_answer(callback, callback.message.edit_text("Xodim qo'shish bekor qilindi."))
 
 
 @router.message(CreateEmployeeStates.waiting_for_professionality)
 async def process_employee_professionality(message: Message, state: FSMContext):
-    """Process professionality and create employee."""
-    if message.text == "❌ Bekor qilish":
-        await state.clear()
-        await message.answer("Xodim qo'shish bekor qilindi.")
-        return
-    
-    data = await state.get_data()
+    """Process professionality."""
     professionality = message.text.strip() if message.text.strip().lower() != 'skip' else ''
+    await state.update_data(professionality=professionality or None)
+    await message.answer("Parolni kiriting:")
+    await state.set_state(CreateEmployeeStates.waiting_for_password)
+
+
+# The password is asked last and never stored: FSM data lives in Redis, so
+# only a salted digest is kept until the confirmation arrives
+PASSWORD_DIGEST_ITERATIONS = 100_000
+
+
+def _password_digest(password: str, salt: bytes) -> str:
+    return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, PASSWORD_DIGEST_ITERATIONS).hex()
+
+
+@router.message(CreateEmployeeStates.waiting_for_password)
+async def process_employee_password(message: Message, state: FSMContext):
+    """Process password."""
+    salt = os.urandom(16)
+    await state.update_data(
+        password_salt=salt.hex(),
+        password_digest=_password_digest(message.text.strip(), salt),
+    )
+    await message.answer("Parolni tasdiqlang (password_confirm):")
+    await state.set_state(CreateEmployeeStates.waiting_for_password_confirm)
+
+
+@router.message(CreateEmployeeStates.waiting_for_password_confirm)
+async def process_employee_password_confirm(message: Message, state: FSMContext):
+    """Process password confirmation and create employee."""
+    data = await state.get_data()
+    password = message.text.strip()
+    digest = _password_digest(password, bytes.fromhex(data.get('password_salt', '')))
+    
+    if not hmac.compare_digest(digest, data.get('password_digest', '')):
+        await message.answer("❌ Parollar mos kelmaydi. Qayta kiriting:")
+        return
     
     user_id = message.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id, fresh=True)
+    if not session:
+        await message.answer("Siz tizimga kirmagansiz. Kirish uchun /start buyrug'ini bosing.")
+        return
+    access_token, role = session.access_token, session.role
     
     employee_data = {
         'email': data.get('email'),
         'first_name': data.get('first_name'),
         'last_name': data.get('last_name'),
         'full_name': data.get('full_name'),
-        'password': data.get('password'),
-        'password_confirm': data.get('password_confirm'),
+        'password': password,
+        'password_confirm': password,
         'role': data.get('role'),
-        'professionality': professionality if professionality else None,
+        'professionality': data.get('professionality'),
         'is_active': True
     }
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.create_employee(employee_data)
-            
-            if response.get('success'):
-                employee_result = response.get('data', {}).get('employee', {})
-                await message.answer(
-                    f"✅ Xodim muvaffaqiyatli qo'shildi!\n\n"
-                    f"<b>Ism:</b> {safe_html_text(employee_result.get('full_name'))}\n"
-                    f"<b>Email:</b> {safe_html_text(employee_result.get('email'))}\n"
-                    f"<b>Rol:</b> {safe_html_text(employee_result.get('role_display') or employee_result.get('role'))}\n\n"
-                    f"⚠️ Eslatma: Yangi xodim o'z parolini o'zgartirishi tavsiya etiladi.",
+        client = get_api_client(access_token, user_id)
+        response = await client.create_employee(employee_data)
+        
+        if response.get('success'):
+            employee_result = response.get('data', {}).get('employee', {})
+            # State is cleared once, in the finally block below
+            await asyncio.gather(
+                response_cache.delete(EMPLOYEES_CACHE),
+                message.answer(
+                    EMPLOYEE_CREATED_TEMPLATE.format(
+                        full_name=safe_html_text(employee_result.get('full_name')),
+                        email=safe_html_text(employee_result.get('email')),
+                        role=safe_html_text(employee_result.get('role_display') or employee_result.get('role')),
+                    ),
                     parse_mode="HTML",
                     reply_markup=get_main_menu_keyboard(role)
-                )
-                await state.clear()
-            else:
-                error_msg = response.get('message', 'Xodim qo\'shilmadi')
-                errors = response.get('errors', {})
-                formatted_error = format_error_message(error_msg, errors)
-                await message.answer(formatted_error)
+                ),
+            )
+        else:
+            error_msg = response.get('message', 'Xodim qo\'shilmadi')
+            errors = response.get('errors', {})
+            formatted_error = format_error_message(error_msg, errors)
+            await message.answer(formatted_error)
+    except APIError as e:
+        await _report_api_error(message, e, "Create employee")
     except Exception as e:
-        logger.error(f"Create employee error: {str(e)}")
+        logger.exception("Create employee error: %s", e)
         await message.answer(f"❌ Xatolik: {str(e)}")
     finally:
         await state.clear()
@@ -422,53 +613,45 @@ async def process_employee_professionality(message: Message, state: FSMContext):
 @router.callback_query(F.data.startswith("edit_employee_"))
 async def edit_employee_start(callback: CallbackQuery, state: FSMContext):
     """Start editing an employee."""
-    employee_id = int(callback.data.split("_")[2])
+    employee_id = int(callback.data.removeprefix("edit_employee_"))
     user_id = callback.from_user.id
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
-
-    access_token = await user_storage.get_access_token(user_id)
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
+        return
+    access_token, role = session.access_token, session.role
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_employee(employee_id)
+        client = get_api_client(access_token, user_id)
+        response = await get_employee_response(client, employee_id)
+        
+        if response.get('success'):
+            employee_data = response.get('data', {})
+            target_role = employee_data.get('role')
+            if not can_update_employee(role, target_role):
+                await callback.answer("❌ Xodimni tahrirlash uchun ruxsat yo'q.", show_alert=True)
+                return
+            await state.update_data(employee_id=employee_id, employee_data=employee_data)
+            await state.set_state(EditEmployeeStates.waiting_for_field)
             
-            if response.get('success'):
-                employee_data = response.get('data', {})
-                target_role = employee_data.get('role')
-                if not can_update_employee(role, target_role):
-                    await callback.answer("❌ Xodimni tahrirlash uchun ruxsat yo'q.", show_alert=True)
-                    return
-                await state.update_data(employee_id=employee_id, employee_data=employee_data)
-                
-                is_active = employee_data.get('is_active', False)
-                status_text = "Profilni bloklash" if is_active else "Profilni aktivlashtirish"
-                
-                text = (
-                    "✏️ <b>Xodimni tahrirlash</b>\n\n"
-                    "Qaysi maydonni tahrirlamoqchisiz?\n\n"
-                    "1️⃣ To'liq ism\n"
-                    "2️⃣ Rol\n"
-                    "3️⃣ Mutaxassislik\n"
-                    f"4️⃣ {status_text}\n\n"
-                    "Raqam yuboring yoki 'Bekor qilish' tugmasini bosing."
-                )
-                
-                # Ensure text doesn't exceed Telegram's limit
-                text = truncate_message(text, max_length=4000)
-                await callback.message.edit_text(
-                    text,
+            # Last step: once the callback is acknowledged, the except blocks
+            # below can no longer answer it
+            await edit_and_answer(
+                callback,
+                callback.message.edit_text(
+                    EDIT_EMPLOYEE_PROMPTS[bool(employee_data.get('is_active', False))],
                     reply_markup=get_cancel_inline_keyboard(),
                     parse_mode="HTML"
                 )
-                await callback.answer()
-                await state.set_state(EditEmployeeStates.waiting_for_field)
-            else:
-                error_msg = response.get('message', 'Xatolik')
-                error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
-                await callback.answer(error_msg, show_alert=True)
+            )
+        else:
+            error_msg = response.get('message', 'Xatolik')
+            error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
+            await callback.answer(error_msg, show_alert=True)
+    except APIError as e:
+        await _report_api_error(callback, e, "Edit employee start")
     except Exception as e:
-        logger.error(f"Edit employee start error: {str(e)}")
+        logger.exception("Edit employee start error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
@@ -476,13 +659,6 @@ async def edit_employee_start(callback: CallbackQuery, state: FSMContext):
 @router.message(EditEmployeeStates.waiting_for_field)
 async def process_edit_employee_field(message: Message, state: FSMContext):
     """Process field selection for editing employee."""
-    if message.text == "❌ Bekor qilish":
-        await state.clear()
-        employee = await user_storage.get_employee(message.from_user.id)
-        role = employee.get('role') if employee else None
-        await message.answer("Tahrirlash bekor qilindi.", reply_markup=get_main_menu_keyboard(role))
-        return
-    
     field_map = {
         '1': 'full_name',
         '2': 'role',
@@ -503,28 +679,12 @@ async def process_edit_employee_field(message: Message, state: FSMContext):
     if field_name == 'is_active':
         # Toggle is_active
         new_value = not employee_data.get('is_active', False)
-        await state.update_data(field_name=field_name, field_value=new_value)
-        await update_employee_field(message, state)
+        await update_employee_field(message, message.from_user.id, state, data.get('employee_id'), field_name, new_value)
     elif field_name == 'role':
         # Show inline keyboard for role selection (filtered)
-        from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-        user_emp = await user_storage.get_employee(message.from_user.id)
-        user_role = user_emp.get('role') if user_emp else None
-        role_names = {
-            'dasturchi': '👨‍💻 Dasturchi',
-            'direktor': '👔 Direktor',
-            'administrator': '👨‍💼 Administrator',
-            'mentor': '👨‍🏫 Mentor',
-            'sotuv_agenti': '👨‍💼 Sotuv Agenti',
-            'assistent': '👨‍🎓 Assistent',
-            'buxgalter': '💰 Buxgalter'
-        }
-        rows = []
-        for r in get_assignable_roles(user_role):
-            rows.append([InlineKeyboardButton(text=role_names.get(r, r), callback_data=f"edit_role_{r}")])
-        rows.append([InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_edit_employee")])
-        keyboard = InlineKeyboardMarkup(inline_keyboard=rows)
-        await message.answer("Yangi rolni tanlang:", reply_markup=keyboard)
+        session = await user_storage.get_session(message.from_user.id)
+        user_role = session.role if session else None
+        await message.answer("Yangi rolni tanlang:", reply_markup=_role_keyboard(user_role, 'edit'))
         await state.set_state(EditEmployeeStates.waiting_for_value)
     else:
         await state.update_data(field_name=field_name)
@@ -546,224 +706,262 @@ async def process_edit_employee_field(message: Message, state: FSMContext):
 @router.callback_query(F.data.startswith("edit_role_"))
 async def process_edit_role_callback(callback: CallbackQuery, state: FSMContext):
     """Process role selection for editing."""
-    role = callback.data.split("_")[2]  # edit_role_dasturchi -> dasturchi
-    await state.update_data(field_name='role', field_value=role)
-    
-    role_names = {
-        'dasturchi': 'Dasturchi',
-        'direktor': 'Direktor',
-        'administrator': 'Administrator',
-        'mentor': 'Mentor',
-        'sotuv_agenti': 'Sotuv Agenti',
-        'assistent': 'Assistent',
-        'buxgalter': 'Buxgalter'
-    }
+    role = callback.data.removeprefix("edit_role_")  # edit_role_sotuv_agenti -> sotuv_agenti
+    data = await state.get_data()
     
-    await callback.message.edit_text(f"✅ Rol tanlandi: {role_names.get(role, role)}")
-    await callback.answer()
-    await update_employee_field_from_callback(callback, state)
+    await edit_and_answer(callback, callback.message.edit_text(f"✅ Rol tanlandi: {ROLE_NAMES_PLAIN.get(role, role)}"))
+    await update_employee_field(callback.message, callback.from_user.id, state, data.get('employee_id'), 'role', role)
 
 
 @router.callback_query(F.data == "cancel_edit_employee")
 async def cancel_edit_employee_callback(callback: CallbackQuery, state: FSMContext):
     """Cancel edit action."""
     await state.clear()
-    await callback.message.edit_text("Tahrirlash bekor qilindi.")
-    await callback.answer()
+    await edit_and_answer(callback, callback.message.edit_text("Tahrirlash bekor qilindi."))
 
 
 @router.message(EditEmployeeStates.waiting_for_value)
 async def process_edit_employee_value(message: Message, state: FSMContext):
     """Process new value for field."""
-    if message.text == "❌ Bekor qilish":
-        await state.clear()
-        employee = await user_storage.get_employee(message.from_user.id)
-        role = employee.get('role') if employee else None
-        await message.answer("Tahrirlash bekor qilindi.", reply_markup=get_main_menu_keyboard(role))
-        return
-    
     data = await state.get_data()
-    field_name = data.get('field_name')
     value = message.text.strip()
     
-    await state.update_data(field_value=value)
-    await update_employee_field(message, state)
+    await update_employee_field(
+        message, message.from_user.id, state, data.get('employee_id'), data.get('field_name'), value
+    )
 
 
-async def update_employee_field_from_callback(callback: CallbackQuery, state: FSMContext):
-    """Update employee field via API (from callback)."""
-    data = await state.get_data()
-    employee_id = data.get('employee_id')
-    field_name = data.get('field_name')
-    field_value = data.get('field_value')
-    user_id = callback.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+async def update_employee_field(
+    target: Message,
+    user_id: int,
+    state: FSMContext,
+    employee_id: Optional[int],
+    field_name: str,
+    field_value: Any,
+):
+    """Update employee field via API and report the result to `target`'s chat.
+
+    `target` is the user's message, or the bot message whose button was pressed.
+    The edit flow's state is cleared when done.
+    """
+    session = await user_storage.get_session(user_id, fresh=True)
+    if not session:
+        await target.answer("Siz tizimga kirmagansiz. Kirish uchun /start buyrug'ini bosing.")
+        return
+    access_token, role = session.access_token, session.role
     
     update_data = {field_name: field_value}
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.update_employee(employee_id, update_data)
-            
-            if response.get('success'):
-                await callback.message.answer(
-                    f"✅ Xodim ma'lumotlari muvaffaqiyatli yangilandi!",
-                    reply_markup=get_main_menu_keyboard(role)
-                )
-                await state.clear()
-            else:
-                error_msg = response.get('message', 'Yangilash muvaffaqiyatsiz')
-                errors = response.get('errors')
-                if errors:
-                    error_msg += f"\n\nXatolar:\n" + "\n".join([f"- {k}: {v[0]}" for k, v in errors.items()])
-                await callback.message.answer(f"❌ Xatolik: {error_msg}")
+        client = get_api_client(access_token, user_id)
+        response = await client.update_employee(employee_id, update_data)
+        
+        if response.get('success'):
+            await response_cache.delete(EMPLOYEES_CACHE)
+            if employee_id == session.employee.get('id'):
+                # The user edited their own profile; keep the session's copy in step
+                await user_storage.update_employee(user_id, update_data)
+                if field_name == 'role':
+                    role = field_value
+            await target.answer(
+                f"✅ Xodim ma'lumotlari muvaffaqiyatli yangilandi!",
+                reply_markup=get_main_menu_keyboard(role)
+            )
+        else:
+            error_msg = response.get('message', 'Yangilash muvaffaqiyatsiz')
+            errors = response.get('errors')
+            formatted_error = format_error_message(error_msg, errors)
+            await target.answer(formatted_error)
+    except APIError as e:
+        await _report_api_error(target, e, "Update employee")
     except Exception as e:
-        logger.error(f"Update employee error: {str(e)}")
-        await callback.message.answer(f"❌ Xatolik: {str(e)}")
+        logger.exception("Update employee error: %s", e)
+        await target.answer(f"❌ Xatolik: {str(e)}")
     finally:
         await state.clear()
 
 
-async def update_employee_field(message: Message, state: FSMContext):
-    """Update employee field via API."""
-    data = await state.get_data()
-    employee_id = data.get('employee_id')
-    field_name = data.get('field_name')
-    field_value = data.get('field_value')
-    user_id = message.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
-    
-    update_data = {field_name: field_value}
-    
-    try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.update_employee(employee_id, update_data)
-            
-            if response.get('success'):
-                await message.answer(
-                    f"✅ Xodim ma'lumotlari muvaffaqiyatli yangilandi!",
-                    reply_markup=get_main_menu_keyboard(role)
-                )
-                await state.clear()
-            else:
-                error_msg = response.get('message', 'Yangilash muvaffaqiyatsiz')
-                errors = response.get('errors')
-                formatted_error = format_error_message(error_msg, errors)
-                await message.answer(formatted_error)
-    except Exception as e:
-        logger.error(f"Update employee error: {str(e)}")
-        await message.answer(f"❌ Xatolik: {str(e)}")
-    finally:
-        await state.clear()
+# Delete Employee Handler
+# (user_id, employee_id) pairs whose delete is being processed
+_deletes_inflight: Set[Tuple[int, int]] = set()
 
 
-# Delete Employee Handler
 @router.callback_query(F.data.startswith("delete_employee_"))
-async def delete_employee_confirm(callback: CallbackQuery, state: FSMContext):
+async def delete_employee_confirm(callback: CallbackQuery):
     """Confirm employee deletion."""
-    employee_id = int(callback.data.split("_")[2])
+    employee_id = int(callback.data.removeprefix("delete_employee_"))
     user_id = callback.from_user.id
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
-    
-    access_token = await user_storage.get_access_token(user_id)
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
+        return
+    access_token, role = session.access_token, session.role
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            # Get employee info for confirmation
-            response = await client.get_employee(employee_id)
+        client = get_api_client(access_token, user_id)
+        # Get employee info for confirmation
+        response = await get_employee_response(client, employee_id)
+        
+        if response.get('success'):
+            employee_data = response.get('data', {})
+            target_role = employee_data.get('role')
+            if not can_delete_employee(role, target_role):
+                await callback.answer("❌ Xodimni o'chirish uchun ruxsat yo'q.", show_alert=True)
+                return
             
-            if response.get('success'):
-                employee_data = response.get('data', {})
-                target_role = employee_data.get('role')
-                if not can_delete_employee(role, target_role):
-                    await callback.answer("❌ Xodimni o'chirish uchun ruxsat yo'q.", show_alert=True)
-                    return
-                await state.update_data(employee_id=employee_id)
-                
-                from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="✅ Ha, o'chirish", callback_data=f"confirm_delete_employee_{employee_id}")],
-                    [InlineKeyboardButton(text="❌ Bekor qilish", callback_data=f"employee_{employee_id}")]
-                ])
-                
-                text = (
-                    f"⚠️ <b>Xodimni o'chirish</b>\n\n"
-                    f"<b>Xodim:</b> {safe_html_text(employee_data.get('full_name'))}\n"
-                    f"<b>ID:</b> {safe_html_text(employee_data.get('id'))}\n\n"
-                    f"⚠️ Bu amalni bekor qilib bo'lmaydi!\n\n"
-                    f"Xodimni o'chirishni tasdiqlaysizmi?"
-                )
-                
-                # Ensure text doesn't exceed Telegram's limit
-                text = truncate_message(text, max_length=4000)
-                await callback.message.edit_text(
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="✅ Ha, o'chirish", callback_data=f"confirm_delete_employee_{employee_id}")],
+                [InlineKeyboardButton(text="❌ Bekor qilish", callback_data=f"employee_{employee_id}")]
+            ])
+            
+            text = EMPLOYEE_DELETE_CONFIRM_TEMPLATE.format(
+                full_name=safe_html_text(employee_data.get('full_name')),
+                id=safe_html_text(employee_data.get('id')),
+            )
+            
+            # Ensure text doesn't exceed Telegram's limit
+            text = truncate_message(text, max_length=4000)
+            await edit_and_answer(
+                callback,
+                callback.message.edit_text(
                     text,
                     reply_markup=keyboard,
                     parse_mode="HTML"
                 )
-                await callback.answer()
-            else:
-                error_msg = response.get('message', 'Xatolik')
-                error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
-                await callback.answer(error_msg, show_alert=True)
+            )
+        else:
+            error_msg = response.get('message', 'Xatolik')
+            error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
+            await callback.answer(error_msg, show_alert=True)
+    except APIError as e:
+        await _report_api_error(callback, e, "Delete employee confirm")
     except Exception as e:
-        logger.error(f"Delete employee confirm error: {str(e)}")
+        logger.exception("Delete employee confirm error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
 
 @router.callback_query(F.data.startswith("confirm_delete_employee_"))
-async def delete_employee_execute(callback: CallbackQuery, state: FSMContext):
+async def delete_employee_execute(callback: CallbackQuery):
     """Execute employee deletion."""
-    employee_id = int(callback.data.split("_")[3])
+    # Buttons sent by older versions carry a trailing role, which is ignored
+    employee_id = int(callback.data.removeprefix("confirm_delete_employee_").partition("_")[0])
     user_id = callback.from_user.id
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    key = (user_id, employee_id)
+    if key in _deletes_inflight:
+        # Repeated click while the first one is still being processed
+        await callback.answer("⏳ Jarayonda...")
+        return
+    _deletes_inflight.add(key)
+    # Acknowledge before any network call so a slow delete can't outlive the
+    # query. This is the query's only answer: _delete_employee reports results
+    # and errors in the message itself or as a reply, never via callback.answer
+    fire_and_forget(callback.answer())
+    try:
+        await _delete_employee(callback, user_id, employee_id)
+    finally:
+        _deletes_inflight.discard(key)
+
+
+async def _show_employees_after_delete(
+    message: Message,
+    employees: list,
+    role: Optional[str],
+    notice: str = "",
+) -> None:
+    """Show the employees list (first page) in place of the delete prompt."""
+    await message.edit_text(
+        notice + EMPLOYEES_LIST_HEADER.format(len(employees)),
+        reply_markup=get_employees_list_keyboard(employees, page=0, role=role),
+        parse_mode="HTML"
+    )
+
+
+async def _delete_employee(
+    callback: CallbackQuery,
+    user_id: int,
+    employee_id: int,
+):
+    """Delete the employee and show the refreshed list.
     
-    access_token = await user_storage.get_access_token(user_id)
+    When the user's list snapshot is at hand, the list without the employee
+    is shown before the delete request is sent and put back if it fails.
+    """
+    session = await user_storage.get_session(user_id, fresh=True)
+    if not session:
+        await callback.message.answer("Siz tizimga kirmagansiz. Kirish uchun /start buyrug'ini bosing.")
+        return
+    access_token, role = session.access_token, session.role
     
+    # The list to put back if the delete fails after being shown as done
+    restore = None
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            # Re-check permission using current target data (safer)
-            emp_resp = await client.get_employee(employee_id)
-            if emp_resp.get('success'):
-                target_role = emp_resp.get('data', {}).get('role')
-                if not can_delete_employee(role, target_role):
-                    await callback.answer("❌ Ruxsat yo'q.", show_alert=True)
-                    return
+        client = get_api_client(access_token, user_id)
+        # Re-check permission against the target's role from the employee cache
+        # (filled when the confirmation was shown); deny if it can't be read
+        snapshot, emp_resp = await asyncio.gather(
+            user_storage.get_cached_employees(user_id),
+            get_employee_response(client, employee_id),
+        )
+        target_role = emp_resp.get('data', {}).get('role') if emp_resp.get('success') else None
+        if target_role is None or not can_delete_employee(role, target_role):
+            await callback.message.answer(ERR_PERMISSION)
+            return
+        
+        list_task = employees = None
+        if snapshot is not None:
+            employees = [employee for employee in snapshot if employee.get('id') != employee_id]
+            await _show_employees_after_delete(
+                callback.message, employees, role, "✅ Xodim muvaffaqiyatli o'chirildi!\n\n"
+            )
+            restore = snapshot
+        else:
+            # Fetch the list for the follow-up screen while the delete is in flight
+            # (uncached: it may be answered before the delete lands)
+            list_task = asyncio.create_task(client.get_employees(cache=False))
+        try:
             response = await client.delete_employee(employee_id)
+        except BaseException:
+            if list_task is not None:
+                list_task.cancel()
+            raise
+        
+        if response.get('success'):
+            restore = None
+            # The delete went through; drop cached copies before anything else can fail
+            await response_cache.delete(EMPLOYEES_CACHE)
+            if list_task is not None:
+                try:
+                    # The prefetch may predate the delete
+                    employees = [
+                        employee for employee in extract_list_from_response(await list_task)
+                        if employee.get('id') != employee_id
+                    ]
+                except Exception as e:
+                    logger.warning("Employees list after delete failed: %s", e)
+                    employees = None
             
-            if response.get('success'):
-                await callback.message.edit_text(
-                    "✅ Xodim muvaffaqiyatli o'chirildi!",
-                    reply_markup=None
-                )
-                await callback.answer("✅ Muvaffaqiyatli!", show_alert=True)
-                
-                # Go back to employees list
-                employees_response = await client.get_employees()
-                employees = extract_list_from_response(employees_response)
-                
-                text = f"👨‍💼 <b>Xodimlar ro'yxati</b> ({len(employees)} ta)\n\n"
-                text += "Quyidagilardan birini tanlang:"
-                
-                await callback.message.answer(
-                    text,
-                    reply_markup=get_employees_list_keyboard(employees, page=0, role=role),
-                    parse_mode="HTML"
-                )
+            if employees is None:
+                # Report the delete without the list rather than as an error
+                await callback.message.edit_text("✅ Xodim muvaffaqiyatli o'chirildi!")
             else:
-                error_msg = response.get('message', 'O\'chirish muvaffaqiyatsiz')
-                error_msg_truncated = truncate_alert_message(f"❌ {error_msg}")
-                await callback.answer(error_msg_truncated, show_alert=True)
+                await user_storage.set_cached_employees(user_id, employees)
+                if list_task is not None:
+                    # One edit shows both the result and the refreshed list
+                    await _show_employees_after_delete(
+                        callback.message, employees, role, "✅ Xodim muvaffaqiyatli o'chirildi!\n\n"
+                    )
+        else:
+            if list_task is not None:
+                list_task.cancel()
+            error_msg = response.get('message', 'O\'chirish muvaffaqiyatsiz')
+            await callback.message.answer(f"❌ {error_msg}")
+    except APIError as e:
+        await _report_api_error(callback.message, e, "Delete employee")
     except Exception as e:
-        logger.error(f"Delete employee error: {str(e)}")
-        error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
-        await callback.answer(error_msg, show_alert=True)
+        logger.exception("Delete employee error: %s", e)
+        await callback.message.answer(f"❌ Xatolik: {str(e)}")
     finally:
-        await state.clear()
+        if restore is not None:
+            # The delete didn't go through; put the list back as it was
+            fire_and_forget(_show_employees_after_delete(callback.message, restore, role))
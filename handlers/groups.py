@@ -3,7 +3,7 @@ from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from api_client import APIClient
+from api_client import get_api_client
 from storage import user_storage
 from keyboards import (
     get_groups_list_keyboard,
@@ -41,40 +41,38 @@ class EditGroupStates(StatesGroup):
     waiting_for_value = State()
 
 
-@router.message(F.text == "📚 Guruhlar")
 async def cmd_groups(message: Message):
     """Show groups list."""
     user_id = message.from_user.id
     
-    if not await user_storage.is_authenticated(user_id):
+    session = await user_storage.get_session(user_id)
+    if not session:
         await message.answer("Siz tizimga kirmagansiz. Kirish uchun /start buyrug'ini bosing.")
         return
     
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    access_token, role = session.access_token, session.role
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_groups()
-            groups = extract_list_from_response(response)
-            
-            if not groups:
-                await message.answer(
-                    "📚 Guruhlar ro'yxati bo'sh.\n\n"
-                    "Yangi guruh qo'shish uchun quyidagi tugmani bosing:",
-                    reply_markup=get_groups_list_keyboard([], page=0, role=role)
-                )
-            else:
-                text = f"📚 <b>Guruhlar ro'yxati</b> ({len(groups)} ta)\n\n"
-                text += "Quyidagilardan birini tanlang:"
-                await message.answer(
-                    text,
-                    reply_markup=get_groups_list_keyboard(groups, page=0, role=role),
-                    parse_mode="HTML"
-                )
+        client = get_api_client(access_token, user_id)
+        response = await client.get_groups()
+        groups = extract_list_from_response(response)
+        
+        if not groups:
+            await message.answer(
+                "📚 Guruhlar ro'yxati bo'sh.\n\n"
+                "Yangi guruh qo'shish uchun quyidagi tugmani bosing:",
+                reply_markup=get_groups_list_keyboard([], page=0, role=role)
+            )
+        else:
+            text = f"📚 <b>Guruhlar ro'yxati</b> ({len(groups)} ta)\n\n"
+            text += "Quyidagilardan birini tanlang:"
+            await message.answer(
+                text,
+                reply_markup=get_groups_list_keyboard(groups, page=0, role=role),
+                parse_mode="HTML"
+            )
     except Exception as e:
-        logger.error(f"Groups list error: {str(e)}")
+        logger.error("Groups list error: %s", e)
         await message.answer(f"❌ Xatolik: {str(e)}")
 
 
@@ -83,21 +81,23 @@ async def groups_pagination(callback: CallbackQuery):
     """Handle groups list pagination."""
     page = int(callback.data.split("_")[-1])
     user_id = callback.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
+        return
+    access_token, role = session.access_token, session.role
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_groups()
-            groups = extract_list_from_response(response)
-            
-            await callback.message.edit_reply_markup(
-                reply_markup=get_groups_list_keyboard(groups, page=page, role=role)
-            )
-            await callback.answer()
+        client = get_api_client(access_token, user_id)
+        response = await client.get_groups()
+        groups = extract_list_from_response(response)
+        
+        await callback.message.edit_reply_markup(
+            reply_markup=get_groups_list_keyboard(groups, page=page, role=role)
+        )
+        await callback.answer()
     except Exception as e:
-        logger.error(f"Groups pagination error: {str(e)}")
+        logger.error("Groups pagination error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
@@ -107,53 +107,55 @@ async def show_group_detail(callback: CallbackQuery):
     """Show group detail."""
     group_id = int(callback.data.split("_")[1])
     user_id = callback.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
+        return
+    access_token, role = session.access_token, session.role
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_group(group_id)
+        client = get_api_client(access_token, user_id)
+        response = await client.get_group(group_id)
+        
+        if response.get('success'):
+            group = response.get('data', {})
             
-            if response.get('success'):
-                group = response.get('data', {})
-                
-                text = (
-                    f"📚 <b>Guruh ma'lumotlari</b>\n\n"
-                    f"<b>ID:</b> {safe_html_text(group.get('id'))}\n"
-                    f"<b>Mutaxassislik:</b> {safe_html_text(group.get('speciality_display') or group.get('speciality_id'))}\n"
-                    f"<b>Kunlar:</b> {safe_html_text(group.get('dates_display') or group.get('dates'))}\n"
-                    f"<b>Vaqt:</b> {safe_html_text(group.get('time'))}\n"
-                    f"<b>Narx:</b> {safe_html_text(group.get('price', 0))} so'm\n"
-                    f"<b>O'rinlar:</b> {safe_html_text(group.get('current_students_count', 0))}/{safe_html_text(group.get('seats', 0))}\n"
-                    f"<b>Bo'sh o'rinlar:</b> {safe_html_text(group.get('available_seats', 0))}\n"
-                )
-                
-                if group.get('starting_date'):
-                    text += f"<b>Boshlanish sanasi:</b> {safe_html_text(str(group.get('starting_date'))[:10])}\n"
-                
-                if group.get('mentor_name'):
-                    text += f"<b>Mentor:</b> {safe_html_text(group.get('mentor_name'))}\n"
-                
-                if group.get('total_lessons'):
-                    text += f"<b>Darslar soni:</b> {safe_html_text(group.get('total_lessons'))}\n"
-                
-                text += f"\n<b>Holat:</b> {'✅ Faol' if group.get('is_active') else '❌ Nofaol'}"
-                
-                # Ensure text doesn't exceed Telegram's limit
-                text = truncate_message(text, max_length=4000)
-                await callback.message.edit_text(
-                    text,
-                    reply_markup=get_group_detail_keyboard(group_id, role),
-                    parse_mode="HTML"
-                )
-                await callback.answer()
-            else:
-                error_msg = response.get('message', 'Xatolik')
-                error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
-                await callback.answer(error_msg, show_alert=True)
+            text = (
+                f"📚 <b>Guruh ma'lumotlari</b>\n\n"
+                f"<b>ID:</b> {safe_html_text(group.get('id'))}\n"
+                f"<b>Mutaxassislik:</b> {safe_html_text(group.get('speciality_display') or group.get('speciality_id'))}\n"
+                f"<b>Kunlar:</b> {safe_html_text(group.get('dates_display') or group.get('dates'))}\n"
+                f"<b>Vaqt:</b> {safe_html_text(group.get('time'))}\n"
+                f"<b>Narx:</b> {safe_html_text(group.get('price', 0))} so'm\n"
+                f"<b>O'rinlar:</b> {safe_html_text(group.get('current_students_count', 0))}/{safe_html_text(group.get('seats', 0))}\n"
+                f"<b>Bo'sh o'rinlar:</b> {safe_html_text(group.get('available_seats', 0))}\n"
+            )
+            
+            if group.get('starting_date'):
+                text += f"<b>Boshlanish sanasi:</b> {safe_html_text(str(group.get('starting_date'))[:10])}\n"
+            
+            if group.get('mentor_name'):
+                text += f"<b>Mentor:</b> {safe_html_text(group.get('mentor_name'))}\n"
+            
+            if group.get('total_lessons'):
+                text += f"<b>Darslar soni:</b> {safe_html_text(group.get('total_lessons'))}\n"
+            
+            text += f"\n<b>Holat:</b> {'✅ Faol' if group.get('is_active') else '❌ Nofaol'}"
+            
+            # Ensure text doesn't exceed Telegram's limit
+            text = truncate_message(text, max_length=4000)
+            await callback.message.edit_text(
+                text,
+                reply_markup=get_group_detail_keyboard(group_id, role),
+                parse_mode="HTML"
+            )
+            await callback.answer()
+        else:
+            error_msg = response.get('message', 'Xatolik')
+            error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
+            await callback.answer(error_msg, show_alert=True)
     except Exception as e:
-        logger.error(f"Group detail error: {str(e)}")
+        logger.error("Group detail error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
@@ -162,26 +164,28 @@ async def show_group_detail(callback: CallbackQuery):
 async def back_to_groups(callback: CallbackQuery):
     """Go back to groups list."""
     user_id = callback.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
+        return
+    access_token, role = session.access_token, session.role
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_groups()
-            groups = extract_list_from_response(response)
-            
-            text = f"📚 <b>Guruhlar ro'yxati</b> ({len(groups)} ta)\n\n"
-            text += "Quyidagilardan birini tanlang:"
-            
-            await callback.message.edit_text(
-                text,
-                reply_markup=get_groups_list_keyboard(groups, page=0, role=role),
-                parse_mode="HTML"
-            )
-            await callback.answer()
+        client = get_api_client(access_token, user_id)
+        response = await client.get_groups()
+        groups = extract_list_from_response(response)
+        
+        text = f"📚 <b>Guruhlar ro'yxati</b> ({len(groups)} ta)\n\n"
+        text += "Quyidagilardan birini tanlang:"
+        
+        await callback.message.edit_text(
+            text,
+            reply_markup=get_groups_list_keyboard(groups, page=0, role=role),
+            parse_mode="HTML"
+        )
+        await callback.answer()
     except Exception as e:
-        logger.error(f"Back to groups error: {str(e)}")
+        logger.error("Back to groups error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
@@ -191,8 +195,8 @@ async def back_to_groups(callback: CallbackQuery):
 async def create_group_start(callback: CallbackQuery, state: FSMContext):
     """Start creating a new group."""
     user_id = callback.from_user.id
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    role = session.role if session else None
 
     if not can_create_group(role):
         await callback.answer("❌ Guruh yaratish uchun Dasturchi, Direktor yoki Administrator roli kerak.", show_alert=True)
@@ -372,9 +376,11 @@ async def process_mentor_and_create(message: Message, state: FSMContext):
     
     data = await state.get_data()
     user_id = message.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await message.answer("Siz tizimga kirmagansiz. Kirish uchun /start buyrug'ini bosing.")
+        return
+    access_token, role = session.access_token, session.role
     
     group_data = {
         'speciality_id': data.get('speciality_id'),
@@ -387,30 +393,30 @@ async def process_mentor_and_create(message: Message, state: FSMContext):
     }
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.create_group(group_data)
-            
-            if response.get('success'):
-                group = response.get('data', {})
-                await message.answer(
-                    f"✅ Guruh muvaffaqiyatli yaratildi!\n\n"
-                    f"<b>ID:</b> {safe_html_text(group.get('id'))}\n"
-                    f"<b>Mutaxassislik:</b> {safe_html_text(group.get('speciality_display'))}\n"
-                    f"<b>Kunlar:</b> {safe_html_text(group.get('dates_display'))}\n"
-                    f"<b>Vaqt:</b> {safe_html_text(group.get('time'))}\n"
-                    f"<b>Narx:</b> {safe_html_text(group.get('price'))} so'm",
-                    reply_markup=get_main_menu_keyboard(role),
-                    parse_mode="HTML"
-                )
-                await state.clear()
-            else:
-                formatted_error = format_error_message(
-                    response.get('message', 'Guruh yaratilmadi'),
-                    response.get('errors')
-                )
-                await message.answer(formatted_error)
+        client = get_api_client(access_token, user_id)
+        response = await client.create_group(group_data)
+        
+        if response.get('success'):
+            group = response.get('data', {})
+            await message.answer(
+                f"✅ Guruh muvaffaqiyatli yaratildi!\n\n"
+                f"<b>ID:</b> {safe_html_text(group.get('id'))}\n"
+                f"<b>Mutaxassislik:</b> {safe_html_text(group.get('speciality_display'))}\n"
+                f"<b>Kunlar:</b> {safe_html_text(group.get('dates_display'))}\n"
+                f"<b>Vaqt:</b> {safe_html_text(group.get('time'))}\n"
+                f"<b>Narx:</b> {safe_html_text(group.get('price'))} so'm",
+                reply_markup=get_main_menu_keyboard(role),
+                parse_mode="HTML"
+            )
+            await state.clear()
+        else:
+            formatted_error = format_error_message(
+                response.get('message', 'Guruh yaratilmadi'),
+                response.get('errors')
+            )
+            await message.answer(formatted_error)
     except Exception as e:
-        logger.error(f"Create group error: {str(e)}")
+        logger.error("Create group error: %s", e)
         await message.answer(f"❌ Xatolik: {str(e)}")
     finally:
         await state.clear()
@@ -422,50 +428,50 @@ async def edit_group_start(callback: CallbackQuery, state: FSMContext):
     """Start editing a group."""
     group_id = int(callback.data.split("_")[2])
     user_id = callback.from_user.id
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    role = session.role if session else None
 
     if not can_update_group(role):
         await callback.answer("❌ Guruhni tahrirlash uchun Dasturchi, Direktor yoki Administrator roli kerak.", show_alert=True)
         return
 
-    access_token = await user_storage.get_access_token(user_id)
+    access_token = session.access_token
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_group(group_id)
+        client = get_api_client(access_token, user_id)
+        response = await client.get_group(group_id)
+        
+        if response.get('success'):
+            group = response.get('data', {})
+            await state.update_data(group_id=group_id, group_data=group)
             
-            if response.get('success'):
-                group = response.get('data', {})
-                await state.update_data(group_id=group_id, group_data=group)
-                
-                text = (
-                    "✏️ <b>Guruhni tahrirlash</b>\n\n"
-                    "Qaysi maydonni tahrirlamoqchisiz?\n\n"
-                    "1️⃣ Mutaxassislik\n"
-                    "2️⃣ Kunlar\n"
-                    "3️⃣ Vaqt\n"
-                    "4️⃣ Boshlanish sanasi\n"
-                    "5️⃣ O'rinlar soni\n"
-                    "6️⃣ Narx\n"
-                    "7️⃣ Darslar soni\n\n"
-                    "Raqam yuboring:"
-                )
-                
-                text = truncate_message(text, max_length=4000)
-                await callback.message.edit_text(
-                    text,
-                    reply_markup=get_back_inline_keyboard(f"group_{group_id}"),
-                    parse_mode="HTML"
-                )
-                await callback.answer()
-                await state.set_state(EditGroupStates.waiting_for_field)
-            else:
-                error_msg = response.get('message', 'Xatolik')
-                error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
-                await callback.answer(error_msg, show_alert=True)
+            text = (
+                "✏️ <b>Guruhni tahrirlash</b>\n\n"
+                "Qaysi maydonni tahrirlamoqchisiz?\n\n"
+                "1️⃣ Mutaxassislik\n"
+                "2️⃣ Kunlar\n"
+                "3️⃣ Vaqt\n"
+                "4️⃣ Boshlanish sanasi\n"
+                "5️⃣ O'rinlar soni\n"
+                "6️⃣ Narx\n"
+                "7️⃣ Darslar soni\n\n"
+                "Raqam yuboring:"
+            )
+            
+            text = truncate_message(text, max_length=4000)
+            await callback.message.edit_text(
+                text,
+                reply_markup=get_back_inline_keyboard(f"group_{group_id}"),
+                parse_mode="HTML"
+            )
+            await callback.answer()
+            await state.set_state(EditGroupStates.waiting_for_field)
+        else:
+            error_msg = response.get('message', 'Xatolik')
+            error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
+            await callback.answer(error_msg, show_alert=True)
     except Exception as e:
-        logger.error(f"Edit group start error: {str(e)}")
+        logger.error("Edit group start error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
@@ -480,40 +486,42 @@ async def cancel_edit_group_action(callback: CallbackQuery, state: FSMContext):
     if group_id:
         # Go back to group detail
         user_id = callback.from_user.id
-        access_token = await user_storage.get_access_token(user_id)
-        employee = await user_storage.get_employee(user_id)
-        role = employee.get('role') if employee else None
+        session = await user_storage.get_session(user_id)
+        if not session:
+            await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
+            return
+        access_token, role = session.access_token, session.role
         
         try:
-            async with APIClient(access_token=access_token, user_id=user_id) as client:
-                response = await client.get_group(group_id)
-                if response.get('success'):
-                    group = response.get('data', {})
-                    text = (
-                        f"📚 <b>Guruh ma'lumotlari</b>\n\n"
-                        f"<b>ID:</b> {safe_html_text(group.get('id'))}\n"
-                        f"<b>Mutaxassislik:</b> {safe_html_text(group.get('speciality_display') or group.get('speciality_id'))}\n"
-                        f"<b>Kunlar:</b> {safe_html_text(group.get('dates_display') or group.get('dates'))}\n"
-                        f"<b>Vaqt:</b> {safe_html_text(group.get('time'))}\n"
-                        f"<b>Narx:</b> {safe_html_text(group.get('price', 0))} so'm\n"
-                        f"<b>O'rinlar:</b> {safe_html_text(group.get('current_students_count', 0))}/{safe_html_text(group.get('seats', 0))}\n"
-                        f"<b>Bo'sh o'rinlar:</b> {safe_html_text(group.get('available_seats', 0))}\n"
-                    )
-                    if group.get('starting_date'):
-                        text += f"<b>Boshlanish sanasi:</b> {safe_html_text(str(group.get('starting_date'))[:10])}\n"
-                    if group.get('mentor_name'):
-                        text += f"<b>Mentor:</b> {safe_html_text(group.get('mentor_name'))}\n"
-                    if group.get('total_lessons'):
-                        text += f"<b>Darslar soni:</b> {safe_html_text(group.get('total_lessons'))}\n"
-                    text += f"\n<b>Holat:</b> {'✅ Faol' if group.get('is_active') else '❌ Nofaol'}"
-                    text = truncate_message(text, max_length=4000)
-                    await callback.message.edit_text(
-                        text,
-                        reply_markup=get_group_detail_keyboard(group_id, role),
-                        parse_mode="HTML"
-                    )
+            client = get_api_client(access_token, user_id)
+            response = await client.get_group(group_id)
+            if response.get('success'):
+                group = response.get('data', {})
+                text = (
+                    f"📚 <b>Guruh ma'lumotlari</b>\n\n"
+                    f"<b>ID:</b> {safe_html_text(group.get('id'))}\n"
+                    f"<b>Mutaxassislik:</b> {safe_html_text(group.get('speciality_display') or group.get('speciality_id'))}\n"
+                    f"<b>Kunlar:</b> {safe_html_text(group.get('dates_display') or group.get('dates'))}\n"
+                    f"<b>Vaqt:</b> {safe_html_text(group.get('time'))}\n"
+                    f"<b>Narx:</b> {safe_html_text(group.get('price', 0))} so'm\n"
+                    f"<b>O'rinlar:</b> {safe_html_text(group.get('current_students_count', 0))}/{safe_html_text(group.get('seats', 0))}\n"
+                    f"<b>Bo'sh o'rinlar:</b> {safe_html_text(group.get('available_seats', 0))}\n"
+                )
+                if group.get('starting_date'):
+                    text += f"<b>Boshlanish sanasi:</b> {safe_html_text(str(group.get('starting_date'))[:10])}\n"
+                if group.get('mentor_name'):
+                    text += f"<b>Mentor:</b> {safe_html_text(group.get('mentor_name'))}\n"
+                if group.get('total_lessons'):
+                    text += f"<b>Darslar soni:</b> {safe_html_text(group.get('total_lessons'))}\n"
+                text += f"\n<b>Holat:</b> {'✅ Faol' if group.get('is_active') else '❌ Nofaol'}"
+                text = truncate_message(text, max_length=4000)
+                await callback.message.edit_text(
+                    text,
+                    reply_markup=get_group_detail_keyboard(group_id, role),
+                    parse_mode="HTML"
+                )
         except Exception as e:
-            logger.error(f"Error going back to group detail: {str(e)}")
+            logger.error("Error going back to group detail: %s", e)
             await callback.message.edit_text("Tahrirlash bekor qilindi.")
     else:
         await callback.message.edit_text("Tahrirlash bekor qilindi.")
@@ -634,40 +642,42 @@ async def process_edit_group_value(message: Message, state: FSMContext):
         if group_id:
             # Go back to group detail
             user_id = message.from_user.id
-            access_token = await user_storage.get_access_token(user_id)
-            employee = await user_storage.get_employee(user_id)
-            role = employee.get('role') if employee else None
+            session = await user_storage.get_session(user_id)
+            if not session:
+                await message.answer("Siz tizimga kirmagansiz. Kirish uchun /start buyrug'ini bosing.")
+                return
+            access_token, role = session.access_token, session.role
             
             try:
-                async with APIClient(access_token=access_token, user_id=user_id) as client:
-                    response = await client.get_group(group_id)
-                    if response.get('success'):
-                        group = response.get('data', {})
-                        text = (
-                            f"📚 <b>Guruh ma'lumotlari</b>\n\n"
-                            f"<b>ID:</b> {safe_html_text(group.get('id'))}\n"
-                            f"<b>Mutaxassislik:</b> {safe_html_text(group.get('speciality_display') or group.get('speciality_id'))}\n"
-                            f"<b>Kunlar:</b> {safe_html_text(group.get('dates_display') or group.get('dates'))}\n"
-                            f"<b>Vaqt:</b> {safe_html_text(group.get('time'))}\n"
-                            f"<b>Narx:</b> {safe_html_text(group.get('price', 0))} so'm\n"
-                            f"<b>O'rinlar:</b> {safe_html_text(group.get('current_students_count', 0))}/{safe_html_text(group.get('seats', 0))}\n"
-                            f"<b>Bo'sh o'rinlar:</b> {safe_html_text(group.get('available_seats', 0))}\n"
-                        )
-                        if group.get('starting_date'):
-                            text += f"<b>Boshlanish sanasi:</b> {safe_html_text(str(group.get('starting_date'))[:10])}\n"
-                        if group.get('mentor_name'):
-                            text += f"<b>Mentor:</b> {safe_html_text(group.get('mentor_name'))}\n"
-                        if group.get('total_lessons'):
-                            text += f"<b>Darslar soni:</b> {safe_html_text(group.get('total_lessons'))}\n"
-                        text += f"\n<b>Holat:</b> {'✅ Faol' if group.get('is_active') else '❌ Nofaol'}"
-                        text = truncate_message(text, max_length=4000)
-                        await message.answer(
-                            text,
-                            reply_markup=get_group_detail_keyboard(group_id, role),
-                            parse_mode="HTML"
-                        )
+                client = get_api_client(access_token, user_id)
+                response = await client.get_group(group_id)
+                if response.get('success'):
+                    group = response.get('data', {})
+                    text = (
+                        f"📚 <b>Guruh ma'lumotlari</b>\n\n"
+                        f"<b>ID:</b> {safe_html_text(group.get('id'))}\n"
+                        f"<b>Mutaxassislik:</b> {safe_html_text(group.get('speciality_display') or group.get('speciality_id'))}\n"
+                        f"<b>Kunlar:</b> {safe_html_text(group.get('dates_display') or group.get('dates'))}\n"
+                        f"<b>Vaqt:</b> {safe_html_text(group.get('time'))}\n"
+                        f"<b>Narx:</b> {safe_html_text(group.get('price', 0))} so'm\n"
+                        f"<b>O'rinlar:</b> {safe_html_text(group.get('current_students_count', 0))}/{safe_html_text(group.get('seats', 0))}\n"
+                        f"<b>Bo'sh o'rinlar:</b> {safe_html_text(group.get('available_seats', 0))}\n"
+                    )
+                    if group.get('starting_date'):
+                        text += f"<b>Boshlanish sanasi:</b> {safe_html_text(str(group.get('starting_date'))[:10])}\n"
+                    if group.get('mentor_name'):
+                        text += f"<b>Mentor:</b> {safe_html_text(group.get('mentor_name'))}\n"
+                    if group.get('total_lessons'):
+                        text += f"<b>Darslar soni:</b> {safe_html_text(group.get('total_lessons'))}\n"
+                    text += f"\n<b>Holat:</b> {'✅ Faol' if group.get('is_active') else '❌ Nofaol'}"
+                    text = truncate_message(text, max_length=4000)
+                    await message.answer(
+                        text,
+                        reply_markup=get_group_detail_keyboard(group_id, role),
+                        parse_mode="HTML"
+                    )
             except Exception as e:
-                logger.error(f"Error going back to group detail: {str(e)}")
+                logger.error("Error going back to group detail: %s", e)
         await state.clear()
         return
     
@@ -726,30 +736,32 @@ async def update_group_field_from_callback(callback: CallbackQuery, state: FSMCo
     field_name = data.get('field_name')
     field_value = data.get('field_value')
     user_id = callback.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await callback.message.answer("Siz tizimga kirmagansiz. Kirish uchun /start buyrug'ini bosing.")
+        return
+    access_token, role = session.access_token, session.role
     
     update_data = {field_name: field_value}
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.update_group(group_id, update_data)
-            
-            if response.get('success'):
-                await callback.message.answer(
-                    f"✅ Guruh ma'lumotlari muvaffaqiyatli yangilandi!",
-                    reply_markup=get_main_menu_keyboard(role)
-                )
-                await state.clear()
-            else:
-                formatted_error = format_error_message(
-                    response.get('message', 'Yangilash muvaffaqiyatsiz'),
-                    response.get('errors')
-                )
-                await callback.message.answer(formatted_error)
+        client = get_api_client(access_token, user_id)
+        response = await client.update_group(group_id, update_data)
+        
+        if response.get('success'):
+            await callback.message.answer(
+                f"✅ Guruh ma'lumotlari muvaffaqiyatli yangilandi!",
+                reply_markup=get_main_menu_keyboard(role)
+            )
+            await state.clear()
+        else:
+            formatted_error = format_error_message(
+                response.get('message', 'Yangilash muvaffaqiyatsiz'),
+                response.get('errors')
+            )
+            await callback.message.answer(formatted_error)
     except Exception as e:
-        logger.error(f"Update group error: {str(e)}")
+        logger.error("Update group error: %s", e)
         await callback.message.answer(f"❌ Xatolik: {str(e)}")
     finally:
         await state.clear()
@@ -762,30 +774,32 @@ async def update_group_field(message: Message, state: FSMContext):
     field_name = data.get('field_name')
     field_value = data.get('field_value')
     user_id = message.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await message.answer("Siz tizimga kirmagansiz. Kirish uchun /start buyrug'ini bosing.")
+        return
+    access_token, role = session.access_token, session.role
     
     update_data = {field_name: field_value}
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.update_group(group_id, update_data)
-            
-            if response.get('success'):
-                await message.answer(
-                    f"✅ Guruh ma'lumotlari muvaffaqiyatli yangilandi!",
-                    reply_markup=get_main_menu_keyboard(role)
-                )
-                await state.clear()
-            else:
-                formatted_error = format_error_message(
-                    response.get('message', 'Yangilash muvaffaqiyatsiz'),
-                    response.get('errors')
-                )
-                await message.answer(formatted_error)
+        client = get_api_client(access_token, user_id)
+        response = await client.update_group(group_id, update_data)
+        
+        if response.get('success'):
+            await message.answer(
+                f"✅ Guruh ma'lumotlari muvaffaqiyatli yangilandi!",
+                reply_markup=get_main_menu_keyboard(role)
+            )
+            await state.clear()
+        else:
+            formatted_error = format_error_message(
+                response.get('message', 'Yangilash muvaffaqiyatsiz'),
+                response.get('errors')
+            )
+            await message.answer(formatted_error)
     except Exception as e:
-        logger.error(f"Update group error: {str(e)}")
+        logger.error("Update group error: %s", e)
         await message.answer(f"❌ Xatolik: {str(e)}")
     finally:
         await state.clear()
@@ -797,51 +811,51 @@ async def delete_group_confirm(callback: CallbackQuery, state: FSMContext):
     """Confirm group deletion."""
     group_id = int(callback.data.split("_")[2])
     user_id = callback.from_user.id
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    role = session.role if session else None
 
     if not can_delete_group(role):
         await callback.answer("❌ Guruhni o'chirish uchun Dasturchi, Direktor yoki Administrator roli kerak.", show_alert=True)
         return
     
-    access_token = await user_storage.get_access_token(user_id)
+    access_token = session.access_token
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            # Get group info for confirmation
-            response = await client.get_group(group_id)
+        client = get_api_client(access_token, user_id)
+        # Get group info for confirmation
+        response = await client.get_group(group_id)
+        
+        if response.get('success'):
+            group = response.get('data', {})
+            await state.update_data(group_id=group_id)
             
-            if response.get('success'):
-                group = response.get('data', {})
-                await state.update_data(group_id=group_id)
-                
-                from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="✅ Ha, o'chirish", callback_data=f"confirm_delete_group_{group_id}")],
-                    [InlineKeyboardButton(text="❌ Bekor qilish", callback_data=f"group_{group_id}")]
-                ])
-                
-                text = (
-                    f"⚠️ <b>Guruhni o'chirish</b>\n\n"
-                    f"<b>Guruh:</b> {safe_html_text(group.get('speciality_display'))}\n"
-                    f"<b>ID:</b> {safe_html_text(group.get('id'))}\n\n"
-                    f"⚠️ Bu amalni bekor qilib bo'lmaydi!\n\n"
-                    f"Guruhni o'chirishni tasdiqlaysizmi?"
-                )
-                
-                text = truncate_message(text, max_length=4000)
-                await callback.message.edit_text(
-                    text,
-                    reply_markup=keyboard,
-                    parse_mode="HTML"
-                )
-                await callback.answer()
-            else:
-                error_msg = response.get('message', 'Xatolik')
-                error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
-                await callback.answer(error_msg, show_alert=True)
+            from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="✅ Ha, o'chirish", callback_data=f"confirm_delete_group_{group_id}")],
+                [InlineKeyboardButton(text="❌ Bekor qilish", callback_data=f"group_{group_id}")]
+            ])
+            
+            text = (
+                f"⚠️ <b>Guruhni o'chirish</b>\n\n"
+                f"<b>Guruh:</b> {safe_html_text(group.get('speciality_display'))}\n"
+                f"<b>ID:</b> {safe_html_text(group.get('id'))}\n\n"
+                f"⚠️ Bu amalni bekor qilib bo'lmaydi!\n\n"
+                f"Guruhni o'chirishni tasdiqlaysizmi?"
+            )
+            
+            text = truncate_message(text, max_length=4000)
+            await callback.message.edit_text(
+                text,
+                reply_markup=keyboard,
+                parse_mode="HTML"
+            )
+            await callback.answer()
+        else:
+            error_msg = response.get('message', 'Xatolik')
+            error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
+            await callback.answer(error_msg, show_alert=True)
     except Exception as e:
-        logger.error(f"Delete group confirm error: {str(e)}")
+        logger.error("Delete group confirm error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
@@ -851,54 +865,54 @@ async def delete_group_execute(callback: CallbackQuery, state: FSMContext):
     """Execute group deletion."""
     group_id = int(callback.data.split("_")[3])
     user_id = callback.from_user.id
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    role = session.role if session else None
 
     if not can_delete_group(role):
         await callback.answer("❌ Ruxsat yo'q.", show_alert=True)
         return
     
-    access_token = await user_storage.get_access_token(user_id)
+    access_token = session.access_token
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.delete_group(group_id)
+        client = get_api_client(access_token, user_id)
+        response = await client.delete_group(group_id)
+        
+        # Check if operation was successful (even if response format is unexpected)
+        if response.get('success') or response.get('message', '').find('o\'chirildi') != -1:
+            success_message = response.get('message', 'Guruh muvaffaqiyatli o\'chirildi.')
             
-            # Check if operation was successful (even if response format is unexpected)
-            if response.get('success') or response.get('message', '').find('o\'chirildi') != -1:
-                success_message = response.get('message', 'Guruh muvaffaqiyatli o\'chirildi.')
+            await callback.message.edit_text(
+                f"✅ <b>Muvaffaqiyatli!</b>\n\n{safe_html_text(success_message)}",
+                reply_markup=None,
+                parse_mode="HTML"
+            )
+            await callback.answer("✅ Guruh o'chirildi!", show_alert=True)
+            
+            # Go back to groups list
+            try:
+                groups_response = await client.get_groups()
+                groups = extract_list_from_response(groups_response)
                 
-                await callback.message.edit_text(
-                    f"✅ <b>Muvaffaqiyatli!</b>\n\n{safe_html_text(success_message)}",
-                    reply_markup=None,
+                text = f"📚 <b>Guruhlar ro'yxati</b> ({len(groups)} ta)\n\n"
+                text += "Quyidagilardan birini tanlang:"
+                
+                await callback.message.answer(
+                    text,
+                    reply_markup=get_groups_list_keyboard(groups, page=0),
                     parse_mode="HTML"
                 )
-                await callback.answer("✅ Guruh o'chirildi!", show_alert=True)
-                
-                # Go back to groups list
-                try:
-                    groups_response = await client.get_groups()
-                    groups = extract_list_from_response(groups_response)
-                    
-                    text = f"📚 <b>Guruhlar ro'yxati</b> ({len(groups)} ta)\n\n"
-                    text += "Quyidagilardan birini tanlang:"
-                    
-                    await callback.message.answer(
-                        text,
-                        reply_markup=get_groups_list_keyboard(groups, page=0),
-                        parse_mode="HTML"
-                    )
-                except Exception as e:
-                    logger.error(f"Error loading groups list after delete: {str(e)}")
-            else:
-                error_msg = response.get('message', 'O\'chirish muvaffaqiyatsiz')
-                error_msg = truncate_alert_message(f"❌ {error_msg}")
-                await callback.answer(error_msg, show_alert=True)
+            except Exception as e:
+                logger.error("Error loading groups list after delete: %s", e)
+        else:
+            error_msg = response.get('message', 'O\'chirish muvaffaqiyatsiz')
+            error_msg = truncate_alert_message(f"❌ {error_msg}")
+            await callback.answer(error_msg, show_alert=True)
     except Exception as e:
         error_str = str(e)
         # Check if it's a 204 parsing issue - if backend says success, treat as success
         if "204" in error_str or "Expected HTTP" in error_str or "o'chirildi" in error_str.lower():
-            logger.info(f"Delete group completed (parsing issue ignored): {str(e)}")
+            logger.info("Delete group completed (parsing issue ignored): %s", e)
             await callback.message.edit_text(
                 "✅ <b>Muvaffaqiyatli!</b>\n\nGuruh muvaffaqiyatli o'chirildi.",
                 reply_markup=None,
@@ -908,20 +922,20 @@ async def delete_group_execute(callback: CallbackQuery, state: FSMContext):
             
             # Try to go back to groups list
             try:
-                async with APIClient(access_token=access_token, user_id=user_id) as client:
-                    groups_response = await client.get_groups()
-                    groups = extract_list_from_response(groups_response)
-                    text = f"📚 <b>Guruhlar ro'yxati</b> ({len(groups)} ta)\n\n"
-                    text += "Quyidagilardan birini tanlang:"
-                    await callback.message.answer(
-                        text,
-                        reply_markup=get_groups_list_keyboard(groups, page=0),
-                        parse_mode="HTML"
-                    )
+                client = get_api_client(access_token, user_id)
+                groups_response = await client.get_groups()
+                groups = extract_list_from_response(groups_response)
+                text = f"📚 <b>Guruhlar ro'yxati</b> ({len(groups)} ta)\n\n"
+                text += "Quyidagilardan birini tanlang:"
+                await callback.message.answer(
+                    text,
+                    reply_markup=get_groups_list_keyboard(groups, page=0),
+                    parse_mode="HTML"
+                )
             except Exception:
                 pass
         else:
-            logger.error(f"Delete group error: {str(e)}")
+            logger.error("Delete group error: %s", e)
             error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
             await callback.answer(error_msg, show_alert=True)
     finally:
@@ -0,0 +1,30 @@
+"""Main menu handlers."""
+from aiogram import Router, F
+from aiogram.dispatcher.event.handler import CallableObject
+from aiogram.types import Message
+from handlers import attendance, auth, documents, employees, groups, payments, students
+
+router = Router()
+
+# Main menu button text -> section handler.
+# Wrapped in CallableObject once so each handler still receives only the
+# arguments it declares (state, etc.), exactly as aiogram would pass them.
+MENU_HANDLERS = {
+    text: CallableObject(handler)
+    for text, handler in (
+        ("👤 Profil", auth.cmd_profile),
+        ("👥 Talabalar", students.cmd_students),
+        ("📚 Guruhlar", groups.cmd_groups),
+        ("💳 To'lovlar", payments.cmd_invoices),
+        ("👨‍💼 Xodimlar", employees.cmd_employees),
+        ("📋 Davomatlar", attendance.cmd_attendances),
+        ("📁 Hujjatlar", documents.cmd_documents),
+        ("❌ Chiqish", auth.cmd_logout),
+    )
+}
+
+
+@router.message(F.text.in_(MENU_HANDLERS))
+async def dispatch_menu(message: Message, **kwargs):
+    """Route a main menu button press with a single dict lookup."""
+    await MENU_HANDLERS[message.text].call(message, **kwargs)
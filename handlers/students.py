@@ -3,7 +3,7 @@ from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from api_client import APIClient
+from api_client import get_api_client
 from storage import user_storage
 from keyboards import (
     get_students_list_keyboard,
@@ -12,7 +12,7 @@ from keyboards import (
     get_cancel_keyboard,
     get_cancel_inline_keyboard
 )
-from utils import extract_list_from_response, format_error_message, truncate_message, truncate_alert_message, safe_html_text, validate_phone, validate_passport
+from utils import extract_list_from_response, format_error_message, truncate_message, truncate_alert_message, safe_html_text, validate_phone, validate_passport, is_valid_email
 import logging
 from permissions import (
     can_create_student,
@@ -45,40 +45,38 @@ class BookStudentStates(StatesGroup):
     waiting_for_group_selection = State()
 
 
-@router.message(F.text == "👥 Talabalar")
 async def cmd_students(message: Message):
     """Show students list."""
     user_id = message.from_user.id
     
-    if not await user_storage.is_authenticated(user_id):
+    session = await user_storage.get_session(user_id)
+    if not session:
         await message.answer("Siz tizimga kirmagansiz. Kirish uchun /start buyrug'ini bosing.")
         return
     
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    access_token, role = session.access_token, session.role
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_students()
-            students = extract_list_from_response(response)
-            
-            if not students:
-                await message.answer(
-                    "📋 Talabalar ro'yxati bo'sh.\n\n"
-                    "Yangi talaba qo'shish uchun quyidagi tugmani bosing:",
-                    reply_markup=get_students_list_keyboard([], page=0, role=role)
-                )
-            else:
-                text = f"📋 <b>Talabalar ro'yxati</b> ({len(students)} ta)\n\n"
-                text += "Quyidagilardan birini tanlang:"
-                await message.answer(
-                    text,
-                    reply_markup=get_students_list_keyboard(students, page=0, role=role),
-                    parse_mode="HTML"
-                )
+        client = get_api_client(access_token, user_id)
+        response = await client.get_students()
+        students = extract_list_from_response(response)
+        
+        if not students:
+            await message.answer(
+                "📋 Talabalar ro'yxati bo'sh.\n\n"
+                "Yangi talaba qo'shish uchun quyidagi tugmani bosing:",
+                reply_markup=get_students_list_keyboard([], page=0, role=role)
+            )
+        else:
+            text = f"📋 <b>Talabalar ro'yxati</b> ({len(students)} ta)\n\n"
+            text += "Quyidagilardan birini tanlang:"
+            await message.answer(
+                text,
+                reply_markup=get_students_list_keyboard(students, page=0, role=role),
+                parse_mode="HTML"
+            )
     except Exception as e:
-        logger.error(f"Students list error: {str(e)}")
+        logger.error("Students list error: %s", e)
         await message.answer(f"❌ Xatolik: {str(e)}")
 
 
@@ -87,21 +85,23 @@ async def students_pagination(callback: CallbackQuery):
     """Handle students list pagination."""
     page = int(callback.data.split("_")[-1])
     user_id = callback.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
+        return
+    access_token, role = session.access_token, session.role
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_students()
-            students = extract_list_from_response(response)
-            
-            await callback.message.edit_reply_markup(
-                reply_markup=get_students_list_keyboard(students, page=page, role=role)
-            )
-            await callback.answer()
+        client = get_api_client(access_token, user_id)
+        response = await client.get_students()
+        students = extract_list_from_response(response)
+        
+        await callback.message.edit_reply_markup(
+            reply_markup=get_students_list_keyboard(students, page=page, role=role)
+        )
+        await callback.answer()
     except Exception as e:
-        logger.error(f"Students pagination error: {str(e)}")
+        logger.error("Students pagination error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
@@ -111,56 +111,58 @@ async def show_student_detail(callback: CallbackQuery):
     """Show student detail."""
     student_id = int(callback.data.split("_")[1])
     user_id = callback.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
+        return
+    access_token, role = session.access_token, session.role
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_student(student_id)
+        client = get_api_client(access_token, user_id)
+        response = await client.get_student(student_id)
+        
+        if response.get('success'):
+            student = response.get('data', {})
             
-            if response.get('success'):
-                student = response.get('data', {})
-                
-                birth_date = student.get('birth_date', 'N/A')
-                if birth_date and birth_date != 'N/A':
-                    birth_date = str(birth_date)[:10]
-                else:
-                    birth_date = 'N/A'
-                
-                text = (
-                    f"👤 <b>Talaba ma'lumotlari</b>\n\n"
-                    f"<b>ID:</b> {safe_html_text(student.get('id'))}\n"
-                    f"<b>Ism:</b> {safe_html_text(student.get('full_name'))}\n"
-                    f"<b>Email:</b> {safe_html_text(student.get('email'))}\n"
-                    f"<b>Telefon:</b> {safe_html_text(student.get('phone'))}\n"
-                    f"<b>Passport:</b> {safe_html_text(student.get('passport_serial_number'))}\n"
-                    f"<b>Tug'ilgan sana:</b> {safe_html_text(birth_date)}\n"
-                    f"<b>Manba:</b> {safe_html_text(student.get('source_display') or student.get('source') or 'N/A')}\n"
-                )
-                
-                if student.get('group_name'):
-                    text += f"<b>Guruh:</b> {safe_html_text(student.get('group_name'))}\n"
-                
-                if student.get('address'):
-                    text += f"<b>Manzil:</b> {safe_html_text(student.get('address'))}\n"
-                
-                text += f"\n<b>Holat:</b> {'✅ Faol' if student.get('is_active') else '❌ Nofaol'}"
-                
-                # Ensure text doesn't exceed Telegram's limit
-                text = truncate_message(text, max_length=4000)
-                await callback.message.edit_text(
-                    text,
-                    reply_markup=get_student_detail_keyboard(student_id, role=role),
-                    parse_mode="HTML"
-                )
-                await callback.answer()
+            birth_date = student.get('birth_date', 'N/A')
+            if birth_date and birth_date != 'N/A':
+                birth_date = str(birth_date)[:10]
             else:
-                error_msg = response.get('message', 'Xatolik')
-                error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
-                await callback.answer(error_msg, show_alert=True)
+                birth_date = 'N/A'
+            
+            text = (
+                f"👤 <b>Talaba ma'lumotlari</b>\n\n"
+                f"<b>ID:</b> {safe_html_text(student.get('id'))}\n"
+                f"<b>Ism:</b> {safe_html_text(student.get('full_name'))}\n"
+                f"<b>Email:</b> {safe_html_text(student.get('email'))}\n"
+                f"<b>Telefon:</b> {safe_html_text(student.get('phone'))}\n"
+                f"<b>Passport:</b> {safe_html_text(student.get('passport_serial_number'))}\n"
+                f"<b>Tug'ilgan sana:</b> {safe_html_text(birth_date)}\n"
+                f"<b>Manba:</b> {safe_html_text(student.get('source_display') or student.get('source') or 'N/A')}\n"
+            )
+            
+            if student.get('group_name'):
+                text += f"<b>Guruh:</b> {safe_html_text(student.get('group_name'))}\n"
+            
+            if student.get('address'):
+                text += f"<b>Manzil:</b> {safe_html_text(student.get('address'))}\n"
+            
+            text += f"\n<b>Holat:</b> {'✅ Faol' if student.get('is_active') else '❌ Nofaol'}"
+            
+            # Ensure text doesn't exceed Telegram's limit
+            text = truncate_message(text, max_length=4000)
+            await callback.message.edit_text(
+                text,
+                reply_markup=get_student_detail_keyboard(student_id, role=role),
+                parse_mode="HTML"
+            )
+            await callback.answer()
+        else:
+            error_msg = response.get('message', 'Xatolik')
+            error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
+            await callback.answer(error_msg, show_alert=True)
     except Exception as e:
-        logger.error(f"Student detail error: {str(e)}")
+        logger.error("Student detail error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
@@ -169,26 +171,28 @@ async def show_student_detail(callback: CallbackQuery):
 async def back_to_students(callback: CallbackQuery):
     """Go back to students list."""
     user_id = callback.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
+        return
+    access_token, role = session.access_token, session.role
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_students()
-            students = extract_list_from_response(response)
-            
-            text = f"📋 **Talabalar ro'yxati** ({len(students)} ta)\n\n"
-            text += "Quyidagilardan birini tanlang:"
-            
-            await callback.message.edit_text(
-                text,
-                reply_markup=get_students_list_keyboard(students, page=0, role=role),
-                parse_mode="Markdown"
-            )
-            await callback.answer()
+        client = get_api_client(access_token, user_id)
+        response = await client.get_students()
+        students = extract_list_from_response(response)
+        
+        text = f"📋 **Talabalar ro'yxati** ({len(students)} ta)\n\n"
+        text += "Quyidagilardan birini tanlang:"
+        
+        await callback.message.edit_text(
+            text,
+            reply_markup=get_students_list_keyboard(students, page=0, role=role),
+            parse_mode="Markdown"
+        )
+        await callback.answer()
     except Exception as e:
-        logger.error(f"Back to students error: {str(e)}")
+        logger.error("Back to students error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
@@ -198,12 +202,12 @@ async def create_student_start(callback: CallbackQuery, state: FSMContext):
     """Start creating a new student."""
     user_id = callback.from_user.id
     
-    if not await user_storage.is_authenticated(user_id):
+    session = await user_storage.get_session(user_id)
+    if not session:
         await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
         return
     
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    role = session.role
     
     if not can_create_student(role):
         await callback.answer("❌ Bu amalni bajarish uchun Dasturchi yoki Administrator roli kerak.", show_alert=True)
@@ -240,7 +244,7 @@ async def process_email(message: Message, state: FSMContext):
         return
     
     email = message.text.strip()
-    if '@' not in email:
+    if not is_valid_email(email):
         await message.answer("Iltimos, to'g'ri email manzil kiriting:")
         return
     
@@ -353,7 +357,11 @@ async def process_address(message: Message, state: FSMContext):
     address = message.text.strip() if message.text.strip().lower() != 'skip' else ''
     
     user_id = message.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await message.answer("Siz tizimga kirmagansiz. Kirish uchun /start buyrug'ini bosing.")
+        return
+    access_token = session.access_token
     
     student_data = {
         'full_name': data.get('full_name'),
@@ -370,27 +378,27 @@ async def process_address(message: Message, state: FSMContext):
     }
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.create_student(student_data)
-            
-            if response.get('success'):
-                student = response.get('data', {})
-                await message.answer(
-                    f"✅ Talaba muvaffaqiyatli qo'shildi!\n\n"
-                    f"<b>Ism:</b> {safe_html_text(student.get('full_name'))}\n"
-                    f"<b>Email:</b> {safe_html_text(student.get('email'))}\n"
-                    f"<b>Telefon:</b> {safe_html_text(student.get('phone'))}\n\n"
-                    f"⚠️ Eslatma: Talaba parolini o'zgartirishi kerak.",
-                    parse_mode="HTML"
-                )
-                await state.clear()
-            else:
-                error_msg = response.get('message', 'Talaba qo\'shilmadi')
-                errors = response.get('errors', {})
-                formatted_error = format_error_message(error_msg, errors)
-                await message.answer(formatted_error)
+        client = get_api_client(access_token, user_id)
+        response = await client.create_student(student_data)
+        
+        if response.get('success'):
+            student = response.get('data', {})
+            await message.answer(
+                f"✅ Talaba muvaffaqiyatli qo'shildi!\n\n"
+                f"<b>Ism:</b> {safe_html_text(student.get('full_name'))}\n"
+                f"<b>Email:</b> {safe_html_text(student.get('email'))}\n"
+                f"<b>Telefon:</b> {safe_html_text(student.get('phone'))}\n\n"
+                f"⚠️ Eslatma: Talaba parolini o'zgartirishi kerak.",
+                parse_mode="HTML"
+            )
+            await state.clear()
+        else:
+            error_msg = response.get('message', 'Talaba qo\'shilmadi')
+            errors = response.get('errors', {})
+            formatted_error = format_error_message(error_msg, errors)
+            await message.answer(formatted_error)
     except Exception as e:
-        logger.error(f"Create student error: {str(e)}")
+        logger.error("Create student error: %s", e)
         await message.answer(f"❌ Xatolik: {str(e)}")
     finally:
         await state.clear()
@@ -402,54 +410,54 @@ async def edit_student_start(callback: CallbackQuery, state: FSMContext):
     """Start editing a student."""
     student_id = int(callback.data.split("_")[2])
     user_id = callback.from_user.id
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    role = session.role if session else None
 
     if not can_update_student(role):
         await callback.answer("❌ Talabani tahrirlash uchun Dasturchi yoki Administrator roli kerak.", show_alert=True)
         return
 
-    access_token = await user_storage.get_access_token(user_id)
+    access_token = session.access_token
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.get_student(student_id)
+        client = get_api_client(access_token, user_id)
+        response = await client.get_student(student_id)
+        
+        if response.get('success'):
+            student = response.get('data', {})
+            await state.update_data(student_id=student_id, student_data=student)
             
-            if response.get('success'):
-                student = response.get('data', {})
-                await state.update_data(student_id=student_id, student_data=student)
-                
-                is_active = student.get('is_active', False)
-                status_text = "Profilni bloklash" if is_active else "Profilni aktivlashtirish"
-                
-                text = (
-                    "✏️ <b>Talabani tahrirlash</b>\n\n"
-                    "Qaysi maydonni tahrirlamoqchisiz?\n\n"
-                    "1️⃣ Ism (full_name)\n"
-                    "2️⃣ Telefon (phone)\n"
-                    "3️⃣ Passport (passport_serial_number)\n"
-                    "4️⃣ Tug'ilgan sana (birth_date)\n"
-                    "5️⃣ Manba (source)\n"
-                    "6️⃣ Manzil (address)\n"
-                    f"7️⃣ {status_text}\n\n"
-                    "Raqam yuboring yoki 'Bekor qilish' tugmasini bosing."
-                )
-                
-                # Ensure text doesn't exceed Telegram's limit
-                text = truncate_message(text, max_length=4000)
-                await callback.message.edit_text(
-                    text,
-                    reply_markup=get_cancel_inline_keyboard(),
-                    parse_mode="HTML"
-                )
-                await callback.answer()
-                await state.set_state(EditStudentStates.waiting_for_field)
-            else:
-                error_msg = response.get('message', 'Xatolik')
-                error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
-                await callback.answer(error_msg, show_alert=True)
+            is_active = student.get('is_active', False)
+            status_text = "Profilni bloklash" if is_active else "Profilni aktivlashtirish"
+            
+            text = (
+                "✏️ <b>Talabani tahrirlash</b>\n\n"
+                "Qaysi maydonni tahrirlamoqchisiz?\n\n"
+                "1️⃣ Ism (full_name)\n"
+                "2️⃣ Telefon (phone)\n"
+                "3️⃣ Passport (passport_serial_number)\n"
+                "4️⃣ Tug'ilgan sana (birth_date)\n"
+                "5️⃣ Manba (source)\n"
+                "6️⃣ Manzil (address)\n"
+                f"7️⃣ {status_text}\n\n"
+                "Raqam yuboring yoki 'Bekor qilish' tugmasini bosing."
+            )
+            
+            # Ensure text doesn't exceed Telegram's limit
+            text = truncate_message(text, max_length=4000)
+            await callback.message.edit_text(
+                text,
+                reply_markup=get_cancel_inline_keyboard(),
+                parse_mode="HTML"
+            )
+            await callback.answer()
+            await state.set_state(EditStudentStates.waiting_for_field)
+        else:
+            error_msg = response.get('message', 'Xatolik')
+            error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
+            await callback.answer(error_msg, show_alert=True)
     except Exception as e:
-        logger.error(f"Edit student start error: {str(e)}")
+        logger.error("Edit student start error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
@@ -588,30 +596,32 @@ async def update_student_field_from_callback(callback: CallbackQuery, state: FSM
     field_name = data.get('field_name')
     field_value = data.get('field_value')
     user_id = callback.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await callback.message.answer("Siz tizimga kirmagansiz. Kirish uchun /start buyrug'ini bosing.")
+        return
+    access_token, role = session.access_token, session.role
     
     update_data = {field_name: field_value}
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.update_student(student_id, update_data)
-            
-            if response.get('success'):
-                await callback.message.answer(
-                    f"✅ Talaba ma'lumotlari muvaffaqiyatli yangilandi!",
-                    reply_markup=get_main_menu_keyboard(role)
-                )
-                await state.clear()
-            else:
-                error_msg = response.get('message', 'Yangilash muvaffaqiyatsiz')
-                errors = response.get('errors')
-                if errors:
-                    error_msg += f"\n\nXatolar:\n" + "\n".join([f"- {k}: {v[0]}" for k, v in errors.items()])
-                await callback.message.answer(f"❌ Xatolik: {error_msg}")
+        client = get_api_client(access_token, user_id)
+        response = await client.update_student(student_id, update_data)
+        
+        if response.get('success'):
+            await callback.message.answer(
+                f"✅ Talaba ma'lumotlari muvaffaqiyatli yangilandi!",
+                reply_markup=get_main_menu_keyboard(role)
+            )
+            await state.clear()
+        else:
+            error_msg = response.get('message', 'Yangilash muvaffaqiyatsiz')
+            errors = response.get('errors')
+            if errors:
+                error_msg += f"\n\nXatolar:\n" + "\n".join([f"- {k}: {v[0]}" for k, v in errors.items()])
+            await callback.message.answer(f"❌ Xatolik: {error_msg}")
     except Exception as e:
-        logger.error(f"Update student error: {str(e)}")
+        logger.error("Update student error: %s", e)
         await callback.message.answer(f"❌ Xatolik: {str(e)}")
     finally:
         await state.clear()
@@ -624,29 +634,31 @@ async def update_student_field(message: Message, state: FSMContext):
     field_name = data.get('field_name')
     field_value = data.get('field_value')
     user_id = message.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await message.answer("Siz tizimga kirmagansiz. Kirish uchun /start buyrug'ini bosing.")
+        return
+    access_token, role = session.access_token, session.role
     
     update_data = {field_name: field_value}
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.update_student(student_id, update_data)
-            
-            if response.get('success'):
-                await message.answer(
-                    f"✅ Talaba ma'lumotlari muvaffaqiyatli yangilandi!",
-                    reply_markup=get_main_menu_keyboard(role)
-                )
-                await state.clear()
-            else:
-                error_msg = response.get('message', 'Yangilash muvaffaqiyatsiz')
-                errors = response.get('errors')
-                formatted_error = format_error_message(error_msg, errors)
-                await message.answer(formatted_error)
+        client = get_api_client(access_token, user_id)
+        response = await client.update_student(student_id, update_data)
+        
+        if response.get('success'):
+            await message.answer(
+                f"✅ Talaba ma'lumotlari muvaffaqiyatli yangilandi!",
+                reply_markup=get_main_menu_keyboard(role)
+            )
+            await state.clear()
+        else:
+            error_msg = response.get('message', 'Yangilash muvaffaqiyatsiz')
+            errors = response.get('errors')
+            formatted_error = format_error_message(error_msg, errors)
+            await message.answer(formatted_error)
     except Exception as e:
-        logger.error(f"Update student error: {str(e)}")
+        logger.error("Update student error: %s", e)
         await message.answer(f"❌ Xatolik: {str(e)}")
     finally:
         await state.clear()
@@ -658,75 +670,79 @@ async def book_student_start(callback: CallbackQuery, state: FSMContext):
     """Start booking a student to a group."""
     student_id = int(callback.data.split("_")[2])
     user_id = callback.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
+        return
+    access_token = session.access_token
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            # Get student info
-            student_response = await client.get_student(student_id)
-            if not student_response.get('success'):
-                error_msg = student_response.get('message', 'Xatolik')
-                error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
-                await callback.answer(error_msg, show_alert=True)
-                return
-            
-            student = student_response.get('data', {})
-            
-            # Check if student already has a group
-            if student.get('group'):
-                await callback.answer(
-                    f"⚠️ Bu talaba allaqachon '{student.get('group_name', 'guruh')}' guruhiga yozilgan.",
-                    show_alert=True
-                )
-                return
-            
-            # Get available groups
-            groups_response = await client.get_booking_groups()
-            # Backend returns list directly or wrapped in success_response
-            if isinstance(groups_response, list):
-                groups = groups_response
-            elif groups_response.get('success'):
-                groups = groups_response.get('data', [])
-            else:
-                groups = groups_response if isinstance(groups_response, list) else []
-            
-            if not groups:
-                await callback.answer("❌ Yozilish uchun mavjud guruhlar topilmadi.", show_alert=True)
-                return
-            
-            await state.update_data(student_id=student_id)
-            
-            # Create keyboard with groups
-            from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-            keyboard = []
-            for group in groups[:10]:  # Limit to 10 groups
-                group_name = group.get('name', f"Guruh #{group.get('id')}")
-                available = group.get('available_seats', 0)
-                keyboard.append([
-                    InlineKeyboardButton(
-                        text=f"{group_name} ({available} o'rin)",
-                        callback_data=f"select_group_{group.get('id')}"
-                    )
-                ])
-            keyboard.append([InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_booking")])
-            
-            text = (
-                f"📚 <b>Talabani guruhga yozish</b>\n\n"
-                f"<b>Talaba:</b> {safe_html_text(student.get('full_name'))}\n\n"
-                f"Quyidagi guruhlardan birini tanlang:"
-            )
-            
-            # Ensure text doesn't exceed Telegram's limit
-            text = truncate_message(text, max_length=4000)
-            await callback.message.edit_text(
-                text,
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard),
-                parse_mode="Markdown"
+        client = get_api_client(access_token, user_id)
+        # Get student info
+        student_response = await client.get_student(student_id)
+        if not student_response.get('success'):
+            error_msg = student_response.get('message', 'Xatolik')
+            error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
+            await callback.answer(error_msg, show_alert=True)
+            return
+        
+        student = student_response.get('data', {})
+        
+        # Check if student already has a group
+        if student.get('group'):
+            await callback.answer(
+                f"⚠️ Bu talaba allaqachon '{student.get('group_name', 'guruh')}' guruhiga yozilgan.",
+                show_alert=True
             )
-            await callback.answer()
-            await state.set_state(BookStudentStates.waiting_for_group_selection)
+            return
+        
+        # Get available groups
+        groups_response = await client.get_booking_groups()
+        # Backend returns list directly or wrapped in success_response
+        if isinstance(groups_response, list):
+            groups = groups_response
+        elif groups_response.get('success'):
+            groups = groups_response.get('data', [])
+        else:
+            groups = groups_response if isinstance(groups_response, list) else []
+        
+        if not groups:
+            await callback.answer("❌ Yozilish uchun mavjud guruhlar topilmadi.", show_alert=True)
+            return
+        
+        await state.update_data(student_id=student_id)
+        
+        # Create keyboard with groups
+        from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+        keyboard = []
+        for group in groups[:10]:  # Limit to 10 groups
+            group_name = group.get('name', f"Guruh #{group.get('id')}")
+            available = group.get('available_seats', 0)
+            keyboard.append([
+                InlineKeyboardButton(
+                    text=f"{group_name} ({available} o'rin)",
+                    callback_data=f"select_group_{group.get('id')}"
+                )
+            ])
+        keyboard.append([InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_booking")])
+        
+        text = (
+            f"📚 <b>Talabani guruhga yozish</b>\n\n"
+            f"<b>Talaba:</b> {safe_html_text(student.get('full_name'))}\n\n"
+            f"Quyidagi guruhlardan birini tanlang:"
+        )
+        
+        # Ensure text doesn't exceed Telegram's limit
+        text = truncate_message(text, max_length=4000)
+        await callback.message.edit_text(
+            text,
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard),
+            parse_mode="Markdown"
+        )
+        await callback.answer()
+        await state.set_state(BookStudentStates.waiting_for_group_selection)
     except Exception as e:
-        logger.error(f"Book student start error: {str(e)}")
+        logger.error("Book student start error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
@@ -738,37 +754,39 @@ async def process_group_selection(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
     student_id = data.get('student_id')
     user_id = callback.from_user.id
-    access_token = await user_storage.get_access_token(user_id)
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    if not session:
+        await callback.answer("Siz tizimga kirmagansiz.", show_alert=True)
+        return
+    access_token, role = session.access_token, session.role
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.book_student(student_id, group_id)
-            
-            if response.get('success'):
-                await callback.message.edit_text(
-                    f"✅ Talaba muvaffaqiyatli guruhga yozildi!",
-                    reply_markup=None
-                )
-                await callback.answer("✅ Muvaffaqiyatli!", show_alert=True)
-                await state.clear()
-            else:
-                error_msg = response.get('message', 'Yozilish muvaffaqiyatsiz')
-                errors = response.get('errors')
-                # For callback.answer, we need shorter messages (max 200 chars for alert)
-                if errors:
-                    error_list = [f"{k}: {v[0]}" for k, v in list(errors.items())[:3]]  # Max 3 errors
-                    error_msg += f" ({', '.join(error_list)})"
-                    if len(errors) > 3:
-                        error_msg += f" va {len(errors) - 3} ta boshqa xato"
-                # Truncate to 200 chars for alert
-                if len(error_msg) > 200:
-                    error_msg = error_msg[:197] + "..."
-                error_msg_truncated = truncate_alert_message(f"❌ {error_msg}")
-                await callback.answer(error_msg_truncated, show_alert=True)
+        client = get_api_client(access_token, user_id)
+        response = await client.book_student(student_id, group_id)
+        
+        if response.get('success'):
+            await callback.message.edit_text(
+                f"✅ Talaba muvaffaqiyatli guruhga yozildi!",
+                reply_markup=None
+            )
+            await callback.answer("✅ Muvaffaqiyatli!", show_alert=True)
+            await state.clear()
+        else:
+            error_msg = response.get('message', 'Yozilish muvaffaqiyatsiz')
+            errors = response.get('errors')
+            # For callback.answer, we need shorter messages (max 200 chars for alert)
+            if errors:
+                error_list = [f"{k}: {v[0]}" for k, v in list(errors.items())[:3]]  # Max 3 errors
+                error_msg += f" ({', '.join(error_list)})"
+                if len(errors) > 3:
+                    error_msg += f" va {len(errors) - 3} ta boshqa xato"
+            # Truncate to 200 chars for alert
+            if len(error_msg) > 200:
+                error_msg = error_msg[:197] + "..."
+            error_msg_truncated = truncate_alert_message(f"❌ {error_msg}")
+            await callback.answer(error_msg_truncated, show_alert=True)
     except Exception as e:
-        logger.error(f"Book student error: {str(e)}")
+        logger.error("Book student error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
     finally:
@@ -789,52 +807,52 @@ async def delete_student_confirm(callback: CallbackQuery, state: FSMContext):
     """Confirm student deletion."""
     student_id = int(callback.data.split("_")[2])
     user_id = callback.from_user.id
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    role = session.role if session else None
 
     if not can_delete_student(role):
         await callback.answer("❌ Talabani o'chirish uchun Dasturchi yoki Administrator roli kerak.", show_alert=True)
         return
     
-    access_token = await user_storage.get_access_token(user_id)
+    access_token = session.access_token
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            # Get student info for confirmation
-            response = await client.get_student(student_id)
+        client = get_api_client(access_token, user_id)
+        # Get student info for confirmation
+        response = await client.get_student(student_id)
+        
+        if response.get('success'):
+            student = response.get('data', {})
+            await state.update_data(student_id=student_id)
             
-            if response.get('success'):
-                student = response.get('data', {})
-                await state.update_data(student_id=student_id)
-                
-                from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="✅ Ha, o'chirish", callback_data=f"confirm_delete_student_{student_id}")],
-                    [InlineKeyboardButton(text="❌ Bekor qilish", callback_data=f"student_{student_id}")]
-                ])
-                
-                text = (
-                    f"⚠️ <b>Talabani o'chirish</b>\n\n"
-                    f"<b>Talaba:</b> {safe_html_text(student.get('full_name'))}\n"
-                    f"<b>ID:</b> {safe_html_text(student.get('id'))}\n\n"
-                    f"⚠️ Bu amalni bekor qilib bo'lmaydi!\n\n"
-                    f"Talabani o'chirishni tasdiqlaysizmi?"
-                )
-                
-                # Ensure text doesn't exceed Telegram's limit
-                text = truncate_message(text, max_length=4000)
-                await callback.message.edit_text(
-                    text,
-                    reply_markup=keyboard,
-                    parse_mode="HTML"
-                )
-                await callback.answer()
-            else:
-                error_msg = response.get('message', 'Xatolik')
-                error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
-                await callback.answer(error_msg, show_alert=True)
+            from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="✅ Ha, o'chirish", callback_data=f"confirm_delete_student_{student_id}")],
+                [InlineKeyboardButton(text="❌ Bekor qilish", callback_data=f"student_{student_id}")]
+            ])
+            
+            text = (
+                f"⚠️ <b>Talabani o'chirish</b>\n\n"
+                f"<b>Talaba:</b> {safe_html_text(student.get('full_name'))}\n"
+                f"<b>ID:</b> {safe_html_text(student.get('id'))}\n\n"
+                f"⚠️ Bu amalni bekor qilib bo'lmaydi!\n\n"
+                f"Talabani o'chirishni tasdiqlaysizmi?"
+            )
+            
+            # Ensure text doesn't exceed Telegram's limit
+            text = truncate_message(text, max_length=4000)
+            await callback.message.edit_text(
+                text,
+                reply_markup=keyboard,
+                parse_mode="HTML"
+            )
+            await callback.answer()
+        else:
+            error_msg = response.get('message', 'Xatolik')
+            error_msg = truncate_alert_message(f"Xatolik: {error_msg}")
+            await callback.answer(error_msg, show_alert=True)
     except Exception as e:
-        logger.error(f"Delete student confirm error: {str(e)}")
+        logger.error("Delete student confirm error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
 
@@ -844,44 +862,44 @@ async def delete_student_execute(callback: CallbackQuery, state: FSMContext):
     """Execute student deletion."""
     student_id = int(callback.data.split("_")[3])
     user_id = callback.from_user.id
-    employee = await user_storage.get_employee(user_id)
-    role = employee.get('role') if employee else None
+    session = await user_storage.get_session(user_id)
+    role = session.role if session else None
 
     if not can_delete_student(role):
         await callback.answer("❌ Ruxsat yo'q.", show_alert=True)
         return
     
-    access_token = await user_storage.get_access_token(user_id)
+    access_token = session.access_token
     
     try:
-        async with APIClient(access_token=access_token, user_id=user_id) as client:
-            response = await client.delete_student(student_id)
+        client = get_api_client(access_token, user_id)
+        response = await client.delete_student(student_id)
+        
+        if response.get('success'):
+            await callback.message.edit_text(
+                "✅ Talaba muvaffaqiyatli o'chirildi!",
+                reply_markup=None
+            )
+            await callback.answer("✅ Muvaffaqiyatli!", show_alert=True)
             
-            if response.get('success'):
-                await callback.message.edit_text(
-                    "✅ Talaba muvaffaqiyatli o'chirildi!",
-                    reply_markup=None
-                )
-                await callback.answer("✅ Muvaffaqiyatli!", show_alert=True)
-                
-                # Go back to students list
-                students_response = await client.get_students()
-                students = extract_list_from_response(students_response)
-                
-                text = f"📋 <b>Talabalar ro'yxati</b> ({len(students)} ta)\n\n"
-                text += "Quyidagilardan birini tanlang:"
-                
-                await callback.message.answer(
-                    text,
-                    reply_markup=get_students_list_keyboard(students, page=0),
-                    parse_mode="HTML"
-                )
-            else:
-                error_msg = response.get('message', 'O\'chirish muvaffaqiyatsiz')
-                error_msg_truncated = truncate_alert_message(f"❌ {error_msg}")
-                await callback.answer(error_msg_truncated, show_alert=True)
+            # Go back to students list
+            students_response = await client.get_students()
+            students = extract_list_from_response(students_response)
+            
+            text = f"📋 <b>Talabalar ro'yxati</b> ({len(students)} ta)\n\n"
+            text += "Quyidagilardan birini tanlang:"
+            
+            await callback.message.answer(
+                text,
+                reply_markup=get_students_list_keyboard(students, page=0),
+                parse_mode="HTML"
+            )
+        else:
+            error_msg = response.get('message', 'O\'chirish muvaffaqiyatsiz')
+            error_msg_truncated = truncate_alert_message(f"❌ {error_msg}")
+            await callback.answer(error_msg_truncated, show_alert=True)
     except Exception as e:
-        logger.error(f"Delete student error: {str(e)}")
+        logger.error("Delete student error: %s", e)
         error_msg = truncate_alert_message(f"Xatolik: {str(e)}")
         await callback.answer(error_msg, show_alert=True)
     finally:
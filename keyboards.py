@@ -1,5 +1,6 @@
 """Keyboard layouts for the bot."""
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
+from functools import lru_cache
 from typing import Optional
 from permissions import (
     can_create_student,
@@ -15,8 +16,8 @@ from permissions import (
 )
 
 
-def get_main_menu_keyboard(role: Optional[str] = None) -> ReplyKeyboardMarkup:
-    """Get main menu keyboard based on user role."""
+def _build_main_menu_keyboard(role: Optional[str]) -> ReplyKeyboardMarkup:
+    """Build main menu keyboard based on user role."""
     keyboard = []
     
     # Common buttons for all employees
@@ -41,6 +42,18 @@ def get_main_menu_keyboard(role: Optional[str] = None) -> ReplyKeyboardMarkup:
     return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
 
 
+# Only dasturchi gets a different layout; build both once and share them
+_MAIN_MENU_KEYBOARD = _build_main_menu_keyboard(None)
+_DEVELOPER_MAIN_MENU_KEYBOARD = _build_main_menu_keyboard('dasturchi')
+
+
+def get_main_menu_keyboard(role: Optional[str] = None) -> ReplyKeyboardMarkup:
+    """Get main menu keyboard based on user role."""
+    if role == 'dasturchi':
+        return _DEVELOPER_MAIN_MENU_KEYBOARD
+    return _MAIN_MENU_KEYBOARD
+
+
 def get_cancel_keyboard() -> ReplyKeyboardMarkup:
     """Get cancel keyboard (for regular messages)."""
     return ReplyKeyboardMarkup(
@@ -236,24 +249,23 @@ def get_invoice_detail_keyboard(invoice_id: int, is_paid: bool = False, status:
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
-def get_employees_list_keyboard(
-    employees: list,
-    page: int = 0,
-    per_page: int = 10,
-    role: Optional[str] = None,
+@lru_cache(maxsize=512)
+def _build_employees_list_keyboard(
+    employees: tuple,
+    page: int,
+    per_page: int,
+    role: Optional[str],
 ) -> InlineKeyboardMarkup:
-    """Get keyboard for employees list with pagination."""
     keyboard = []
     
     start_idx = page * per_page
     end_idx = start_idx + per_page
     
-    for employee in employees[start_idx:end_idx]:
-        employee_name = employee.get('full_name', f"Employee {employee.get('id')}")
+    for employee_id, employee_name in employees[start_idx:end_idx]:
         keyboard.append([
             InlineKeyboardButton(
                 text=employee_name,
-                callback_data=f"employee_{employee.get('id')}"
+                callback_data=f"employee_{employee_id}"
             )
         ])
     
@@ -274,6 +286,24 @@ def get_employees_list_keyboard(
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+def get_employees_list_keyboard(
+    employees: list,
+    page: int = 0,
+    per_page: int = 10,
+    role: Optional[str] = None,
+) -> InlineKeyboardMarkup:
+    """Get keyboard for employees list with pagination.
+
+    Only ids and names end up on the buttons, so the markup is cached on those;
+    paging through an unchanged list reuses the prebuilt keyboard.
+    """
+    items = tuple(
+        (employee.get('id'), employee.get('full_name', f"Employee {employee.get('id')}"))
+        for employee in employees
+    )
+    return _build_employees_list_keyboard(items, page, per_page, role)
+
+
 def get_employee_detail_keyboard(employee_id: int, role: Optional[str] = None, target_role: Optional[str] = None) -> InlineKeyboardMarkup:
     """Get keyboard for employee detail view."""
     keyboard = []
@@ -0,0 +1,43 @@
+"""Custom aiogram middlewares."""
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery
+
+# Prune expired keys once the table grows past this many entries
+THROTTLE_PRUNE_SIZE = 10_000
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Drop repeated callback queries that arrive within `rate` seconds.
+
+    `key_builder` maps a callback to its throttle key; returning None lets
+    the callback through untouched. A dropped callback is only acknowledged,
+    so the button stops spinning without reaching the handler.
+    """
+
+    def __init__(self, rate: float, key_builder: Callable[[CallbackQuery], Optional[str]]):
+        self.rate = rate
+        self.key_builder = key_builder
+        self._last_seen: Dict[str, float] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[CallbackQuery, Dict[str, Any]], Awaitable[Any]],
+        event: CallbackQuery,
+        data: Dict[str, Any],
+    ) -> Any:
+        key = self.key_builder(event)
+        if key is None:
+            return await handler(event, data)
+
+        now = time.monotonic()
+        last = self._last_seen.get(key)
+        if last is not None and now - last < self.rate:
+            await event.answer()
+            return None
+
+        if len(self._last_seen) >= THROTTLE_PRUNE_SIZE:
+            self._last_seen = {k: t for k, t in self._last_seen.items() if now - t < self.rate}
+        self._last_seen[key] = now
+        return await handler(event, data)
@@ -8,7 +8,8 @@ similar to bimuz-dashboard/src/lib/permissions.ts.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, List, Optional
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
 
 
 # Role hierarchy (higher = more privilege)
@@ -29,6 +30,14 @@ def get_role_level(role: Optional[str]) -> int:
     return ROLE_LEVEL.get(role, 0)
 
 
+# Roles at Administrator level or above, resolved once at import.
+# Unknown roles and None are level 0, so plain membership matches the
+# `get_role_level(role) >= ROLE_LEVEL["administrator"]` checks.
+_ADMIN_ROLES = frozenset(
+    role for role, level in ROLE_LEVEL.items() if level >= ROLE_LEVEL["administrator"]
+)
+
+
 # ---- Employees (Xodimlar) permissions ----
 
 def can_view_employees(_user_role: Optional[str]) -> bool:
@@ -38,7 +47,7 @@ def can_view_employees(_user_role: Optional[str]) -> bool:
 
 def can_create_employee(user_role: Optional[str]) -> bool:
     """Create employee: Dasturchi, Direktor, Administrator."""
-    return get_role_level(user_role) >= ROLE_LEVEL["administrator"]
+    return user_role in _ADMIN_ROLES
 
 
 def can_update_employee(user_role: Optional[str], target_role: Optional[str]) -> bool:
@@ -79,50 +88,53 @@ def can_assign_role(user_role: Optional[str], target_role: str) -> bool:
     return False
 
 
-def get_assignable_roles(user_role: Optional[str]) -> List[str]:
-    all_roles = [
-        "dasturchi",
-        "direktor",
-        "administrator",
-        "buxgalter",
-        "sotuv_agenti",
-        "mentor",
-        "assistent",
-    ]
-    return [r for r in all_roles if can_assign_role(user_role, r)]
+_ALL_ROLES = (
+    "dasturchi",
+    "direktor",
+    "administrator",
+    "buxgalter",
+    "sotuv_agenti",
+    "mentor",
+    "assistent",
+)
+
+
+@lru_cache(maxsize=None)
+def get_assignable_roles(user_role: Optional[str]) -> Tuple[str, ...]:
+    return tuple(r for r in _ALL_ROLES if can_assign_role(user_role, r))
 
 
 # ---- Students (Talabalar) permissions ----
 
 def can_create_student(user_role: Optional[str]) -> bool:
-    return get_role_level(user_role) >= ROLE_LEVEL["administrator"]
+    return user_role in _ADMIN_ROLES
 
 
 def can_update_student(user_role: Optional[str]) -> bool:
-    return get_role_level(user_role) >= ROLE_LEVEL["administrator"]
+    return user_role in _ADMIN_ROLES
 
 
 def can_delete_student(user_role: Optional[str]) -> bool:
-    return get_role_level(user_role) >= ROLE_LEVEL["administrator"]
+    return user_role in _ADMIN_ROLES
 
 
 def can_book_student_to_group(user_role: Optional[str]) -> bool:
     """Booking is an operational action; keep it for full-access roles."""
-    return get_role_level(user_role) >= ROLE_LEVEL["administrator"]
+    return user_role in _ADMIN_ROLES
 
 
 # ---- Groups (Guruhlar) permissions ----
 
 def can_create_group(user_role: Optional[str]) -> bool:
-    return get_role_level(user_role) >= ROLE_LEVEL["administrator"]
+    return user_role in _ADMIN_ROLES
 
 
 def can_update_group(user_role: Optional[str]) -> bool:
-    return get_role_level(user_role) >= ROLE_LEVEL["administrator"]
+    return user_role in _ADMIN_ROLES
 
 
 def can_delete_group(user_role: Optional[str]) -> bool:
-    return get_role_level(user_role) >= ROLE_LEVEL["administrator"]
+    return user_role in _ADMIN_ROLES
 
 
 # ---- Attendance (Davomatlar) ----
@@ -1,20 +1,45 @@
 """Storage for user session data using Redis."""
-from typing import Optional, Dict, Any
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 import json
+import time
 import redis.asyncio as redis
-from config import REDIS_URL
+from config import config
 import logging
 
 logger = logging.getLogger(__name__)
 
+# How long a session read from Redis is reused in-process, in seconds.
+# Only this process's own writes drop an entry early; a login, token refresh
+# or logout handled by another replica is seen here up to this much later.
+SESSION_CACHE_TTL = 60
+SESSION_CACHE_SIZE = 10_000
+
+# Employee fields kept in the session; the full profile is fetched from the API
+SESSION_EMPLOYEE_FIELDS = ('id', 'full_name', 'role')
+
+
+@dataclass(frozen=True, slots=True)
+class Session:
+    """Authenticated user's session, as stored in Redis."""
+    access_token: str
+    refresh_token: Optional[str]
+    employee: Dict[str, Any]
+    
+    @property
+    def role(self) -> Optional[str]:
+        return self.employee.get('role')
+
 
 class UserStorage:
     """Redis-based storage for user sessions."""
     
     def __init__(self):
         self.redis_client: Optional[redis.Redis] = None
-        self._redis_url = REDIS_URL
+        self._redis_url = config.redis_url
+        # user_id -> (loaded_at, session); avoids a Redis round trip per handler
+        self._sessions: Dict[int, Tuple[float, Session]] = {}
     
     async def _get_redis(self) -> redis.Redis:
         """Get or create Redis client."""
@@ -26,7 +51,7 @@ class UserStorage:
                     encoding="utf-8"
                 )
             except Exception as e:
-                logger.error(f"Failed to connect to Redis: {str(e)}")
+                logger.error("Failed to connect to Redis: %s", e)
                 raise
         return self.redis_client
     
@@ -35,23 +60,29 @@ class UserStorage:
         return f"bot:session:{user_id}"
     
     async def set_user_data(self, user_id: int, access_token: str, refresh_token: str, employee_data: Dict[str, Any]):
-        """Store user session data."""
+        """Store user session data (only SESSION_EMPLOYEE_FIELDS of the employee)."""
         try:
             redis_client = await self._get_redis()
             key = self._get_key(user_id)
             
+            employee = {
+                field: employee_data[field]
+                for field in SESSION_EMPLOYEE_FIELDS
+                if field in employee_data
+            }
             session_data = {
                 'access_token': access_token,
                 'refresh_token': refresh_token,
-                'employee': json.dumps(employee_data, default=str),
+                'employee': json.dumps(employee, default=str),
                 'last_activity': datetime.now().isoformat()
             }
             
             # Store with 7 days expiration (same as refresh token lifetime)
             await redis_client.hset(key, mapping=session_data)
             await redis_client.expire(key, 7 * 24 * 60 * 60)  # 7 days
+            self._sessions.pop(user_id, None)
         except Exception as e:
-            logger.error(f"Error storing user data: {str(e)}")
+            logger.error("Error storing user data: %s", e)
             raise
     
     async def get_user_data(self, user_id: int) -> Optional[Dict[str, Any]]:
@@ -70,7 +101,7 @@ class UserStorage:
             
             return data
         except Exception as e:
-            logger.error(f"Error getting user data: {str(e)}")
+            logger.error("Error getting user data: %s", e)
             return None
     
     async def get_access_token(self, user_id: int) -> Optional[str]:
@@ -80,7 +111,7 @@ class UserStorage:
             key = self._get_key(user_id)
             return await redis_client.hget(key, 'access_token')
         except Exception as e:
-            logger.error(f"Error getting access token: {str(e)}")
+            logger.error("Error getting access token: %s", e)
             return None
     
     async def get_refresh_token(self, user_id: int) -> Optional[str]:
@@ -90,7 +121,7 @@ class UserStorage:
             key = self._get_key(user_id)
             return await redis_client.hget(key, 'refresh_token')
         except Exception as e:
-            logger.error(f"Error getting refresh token: {str(e)}")
+            logger.error("Error getting refresh token: %s", e)
             return None
     
     async def get_employee(self, user_id: int) -> Optional[Dict[str, Any]]:
@@ -103,7 +134,7 @@ class UserStorage:
                 return json.loads(employee_json)
             return None
         except Exception as e:
-            logger.error(f"Error getting employee data: {str(e)}")
+            logger.error("Error getting employee data: %s", e)
             return None
     
     async def update_access_token(self, user_id: int, access_token: str):
@@ -114,17 +145,91 @@ class UserStorage:
             
             await redis_client.hset(key, 'access_token', access_token)
             await redis_client.hset(key, 'last_activity', datetime.now().isoformat())
+            self._sessions.pop(user_id, None)
         except Exception as e:
-            logger.error(f"Error updating access token: {str(e)}")
+            logger.error("Error updating access token: %s", e)
+    
+    async def update_employee(self, user_id: int, fields: Dict[str, Any]):
+        """Merge changed profile fields into the stored session employee."""
+        fields = {k: v for k, v in fields.items() if k in SESSION_EMPLOYEE_FIELDS}
+        if not fields:
+            return
+        try:
+            employee = await self.get_employee(user_id)
+            if employee is None:
+                return
+            employee.update(fields)
+            redis_client = await self._get_redis()
+            await redis_client.hset(self._get_key(user_id), 'employee', json.dumps(employee, default=str))
+            self._sessions.pop(user_id, None)
+        except Exception as e:
+            logger.error("Error updating employee data: %s", e)
     
     async def remove_user(self, user_id: int):
         """Remove user session."""
         try:
             redis_client = await self._get_redis()
             key = self._get_key(user_id)
-            await redis_client.delete(key)
+            self._sessions.pop(user_id, None)
+            await redis_client.delete(key, f"bot:employees:{user_id}")
         except Exception as e:
-            logger.error(f"Error removing user: {str(e)}")
+            logger.error("Error removing user: %s", e)
+    
+    async def set_cached_employees(self, user_id: int, employees: List[Dict[str, Any]], ttl: int = 300):
+        """Remember the employees list the user is paging through."""
+        try:
+            redis_client = await self._get_redis()
+            await redis_client.set(f"bot:employees:{user_id}", json.dumps(employees, default=str), ex=ttl)
+        except Exception as e:
+            logger.error("Error caching employees list: %s", e)
+    
+    async def get_cached_employees(self, user_id: int) -> Optional[List[Dict[str, Any]]]:
+        """Get the employees list snapshot stored by set_cached_employees."""
+        try:
+            redis_client = await self._get_redis()
+            employees_json = await redis_client.get(f"bot:employees:{user_id}")
+            return json.loads(employees_json) if employees_json else None
+        except Exception as e:
+            logger.error("Error getting cached employees list: %s", e)
+            return None
+    
+    async def get_session(self, user_id: int, fresh: bool = False) -> Optional[Session]:
+        """Get the user's session, or None if not logged in.
+        
+        Sessions are cached in-process for SESSION_CACHE_TTL seconds and
+        dropped whenever this process writes or removes them. Other replicas
+        don't know about those writes, so a user logged out elsewhere can
+        still get a session from here; pass fresh=True on data-changing
+        paths to always read Redis.
+        """
+        cached = self._sessions.get(user_id)
+        if not fresh and cached is not None and time.monotonic() - cached[0] < SESSION_CACHE_TTL:
+            return cached[1]
+        
+        try:
+            redis_client = await self._get_redis()
+            # One round trip for exactly the fields a handler needs
+            access_token, refresh_token, employee_json = await redis_client.hmget(
+                self._get_key(user_id), 'access_token', 'refresh_token', 'employee'
+            )
+        except Exception as e:
+            logger.error("Error getting session: %s", e)
+            return None
+        
+        if not access_token:
+            self._sessions.pop(user_id, None)
+            return None
+        
+        session = Session(
+            access_token=access_token,
+            refresh_token=refresh_token,
+            employee=json.loads(employee_json) if employee_json else {}
+        )
+        if len(self._sessions) >= SESSION_CACHE_SIZE:
+            # Drop the oldest entry (dicts keep insertion order)
+            self._sessions.pop(next(iter(self._sessions)))
+        self._sessions[user_id] = (time.monotonic(), session)
+        return session
     
     async def is_authenticated(self, user_id: int) -> bool:
         """Check if user is authenticated."""
@@ -132,7 +237,7 @@ class UserStorage:
             access_token = await self.get_access_token(user_id)
             return access_token is not None
         except Exception as e:
-            logger.error(f"Error checking authentication: {str(e)}")
+            logger.error("Error checking authentication: %s", e)
             return False
     
     async def close(self):
@@ -1,6 +1,10 @@
 """Utility functions for the bot."""
+import re
 from typing import List, Dict, Any, Optional
 
+# Something@domain.tld, no whitespace; the backend does the strict check
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
 
 def extract_list_from_response(response: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
@@ -134,6 +138,11 @@ def safe_html_text(text: str) -> str:
     return escape_html(text)
 
 
+def is_valid_email(email: str) -> bool:
+    """Check email shape before sending it to the backend."""
+    return _EMAIL_RE.match(email) is not None
+
+
 def validate_phone(phone: str) -> tuple[bool, str]:
     """
     Validate phone number format: +998901234567